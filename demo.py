@@ -1,4 +1,8 @@
-import nltk
+try:
+    import orjson
+except ImportError:
+    orjson = None
+from nltk.tokenize import TreebankWordTokenizer
 from speach import ttl
 from speach.sqlite import TTLSQLite
 
@@ -7,14 +11,34 @@ from speach.sqlite import TTLSQLite
 # Helper functions
 # ------------------------------------------------------------------------------
 
-def dump_sent(sent):
-    ''' Print a sentence to console '''
+# each sample text is a single sentence, so a word tokenizer is created once and reused
+# instead of loading the Punkt sentence model on every nltk.word_tokenize() call
+word_tokenizer = TreebankWordTokenizer()
+
+
+def to_json(sent):
+    ''' Serialise a sentence to a JSON string, using orjson when it is available
+
+    orjson writes compact JSON (no spaces after separators), otherwise the output of sent.to_json() is kept
+    '''
+    if orjson is not None:
+        try:
+            return orjson.dumps(sent.to_dict()).decode('utf-8')
+        except TypeError:
+            # orjson.JSONEncodeError, e.g. values that only chirptext's encoder can handle
+            pass
+    return sent.to_json()
+
+
+def dump_sent(sent, verbose=False):
+    ''' Print a sentence to console (set verbose to True to print its JSON as well) '''
     print("Raw: {}".format(sent.text))
     print("Tokens: {}".format(sent.tokens))
     print("Concepts: {}".format(sent.concepts))
     for c in sent.concepts:
         print("    > {}".format(c))
-    print(sent.to_json())
+    if verbose:
+        print(to_json(sent))
 
 
 # ------------------------------------------------------------------------------
@@ -35,11 +59,13 @@ doc = db.doc.select_single('name=?', ('eng1',))
 if not db.sent.select('docID=?', (doc.ID,)):
     sent = ttl.Sentence("I am a short sentence.")
     # tokenize the sentence with NLTK tokenizer
-    tokens = nltk.word_tokenize(sent.text)
+    tokens = word_tokenizer.tokenize(sent.text)
     sent.import_tokens(tokens)
+    # map token text to token index once so that concepts can be linked by word
+    token_idx = {tk: idx for idx, tk in enumerate(tokens)}
     # add concepts
-    sent.new_concept('01436003-a', 'short', tokens=[3])
-    sent.new_concept('06285090-n', 'sentence', tokens=[4])
+    sent.new_concept('01436003-a', 'short', tokens=[token_idx['short']])
+    sent.new_concept('06285090-n', 'sentence', tokens=[token_idx['sentence']])
     # comment on sentences
     sent.comment = 'This is just an example to demonstrate how to use TTL.'
     # print it out
@@ -51,18 +77,20 @@ if not db.sent.select('docID=?', (doc.ID,)):
     # create a second sentence with MWE
     calico_text = 'I like calico cat.'
     calico_cat_synset = '02123242-n'
-    if not db.sent.select('text = ?', (calico_text,)):
-        sent = ttl.Sentence(calico_text)
-        sent.new_tag('三毛猫が好きです。', tagtype='jpn')
-        sent.import_tokens(nltk.word_tokenize(sent.text))
-        # create concepts
-        sent.new_concept('01777210-v', 'like', tokens=[1])
-        sent.new_concept(calico_cat_synset, 'calico cat', tokens=[2, 3])  # MWE -> tokens=[2,3]
-        sent[2].new_tag('+', tagtype='MWE')
-        sent[3].new_tag('+', tagtype='MWE')
-        dump_sent(sent)
-        # save it to database
-        sent.docID = doc.ID
-        db.save_sent(sent)
+    sent = ttl.Sentence(calico_text)
+    sent.new_tag('三毛猫が好きです。', tagtype='jpn')
+    tokens = word_tokenizer.tokenize(sent.text)
+    sent.import_tokens(tokens)
+    token_idx = {tk: idx for idx, tk in enumerate(tokens)}
+    # create concepts
+    calico_cat_idx = [token_idx['calico'], token_idx['cat']]
+    sent.new_concept('01777210-v', 'like', tokens=[token_idx['like']])
+    sent.new_concept(calico_cat_synset, 'calico cat', tokens=calico_cat_idx)  # MWE -> tokens=[2,3]
+    for idx in calico_cat_idx:
+        sent[idx].new_tag('+', tagtype='MWE')
+    dump_sent(sent)
+    # save it to database (skipped if the same text is already in this document)
+    sent.docID = doc.ID
+    db.save_sent(sent, on_conflict='ignore')
 
 print("Done!")
@@ -1,23 +1,61 @@
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from speach import elan
 
 
 transcript_folder = Path('./test/data/')
-csv_data = []
-for child_file in transcript_folder.iterdir():
-    if child_file.suffix.endswith('.eaf'):
-        print(child_file.name)
-        c = 0
-        eaf = elan.read_eaf(child_file)
-        for tier in eaf.roots:
-            if tier.type_ref == 'Utterance':
-                print(f"  | {tier.ID} | Participant: {tier.participant} | Type: {tier.type_ref}")
-                for ann in tier:
-                    if 'BABYNAME' in ann.text:
-                        c += 1
-                        print(f"  | -- {tier.ID} --> {tier.participant}: {ann.text}")
-        print(c)
-        csv_data.append((child_file.name, c))
-
-for fn, c in csv_data:
-    print(f"{fn}\t{c}")
+KEYWORDS = ('BABYNAME',)
+
+# match all keywords in a single pass over each annotation
+try:
+    import ahocorasick
+    _automaton = ahocorasick.Automaton()
+    for _kw in KEYWORDS:
+        _automaton.add_word(_kw, _kw)
+    _automaton.make_automaton()
+
+    def has_keyword(text):
+        return next(_automaton.iter(text), None) is not None
+except ImportError:
+    _keyword_pattern = re.compile('|'.join(map(re.escape, KEYWORDS)))
+
+    def has_keyword(text):
+        return _keyword_pattern.search(text) is not None
+
+
+def is_utterance_tier(tier):
+    return tier.type_ref_id == 'Utterance'
+
+
+def scan_eaf(child_file):
+    """ Count keyword mentions in the utterance tiers of an EAF file """
+    file_name = os.path.basename(child_file)
+    lines = [file_name]
+    c = 0
+    tier_id = None
+    # stream annotations instead of building the whole document tree
+    for tier, ann in elan.iter_annotations(child_file, is_utterance_tier):
+        if tier.ID != tier_id:
+            tier_id = tier.ID
+            lines.append(f"  | {tier.ID} | Participant: {tier.participant} | Type: {tier.type_ref_id}")
+        if has_keyword(ann.text):
+            c += 1
+            lines.append(f"  | -- {tier.ID} --> {tier.participant}: {ann.text}")
+    lines.append(str(c))
+    # print the report at once so that output from workers does not interleave
+    print("\n".join(lines))
+    return file_name, c
+
+
+if __name__ == '__main__':
+    # EAF files are independent, so they are parsed in parallel processes
+    # os.scandir() reuses file type info from the directory listing instead of calling stat() per entry
+    with os.scandir(transcript_folder) as entries:
+        eaf_files = [e.path for e in entries if e.name.endswith('.eaf') and e.is_file(follow_symlinks=False)]
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        csv_data = list(executor.map(scan_eaf, eaf_files, chunksize=4))
+
+    for fn, c in csv_data:
+        print(f"{fn}\t{c}")
@@ -1,4 +1,5 @@
 import os
+import zipfile
 from speach import media
 from speach import elan
 from chirptext import chio
@@ -25,13 +26,16 @@ media.cut("./test_data/processed/test.m4a", "./test_data/processed/test_10-15.og
 # More complex use case
 # Read an ELAN transcription file and:
 #    1. Cut all utterances into separated ogg files
-#    2. Write annotation text into separated text files
+#    2. Write annotation text into separated text files (stored in a single zip archive)
 #    3. Write all utterances into a CSV file with annotation IDs and individual audio filenames
 # --------------------------------------------------------------------------------------------
 eaf = elan.read_eaf("./test_data/fables_01_03_aesop_64kb.eaf")
 csv_rows = [["annID", "Text", "Filename"]]
-for ann in eaf["Story"]:
-    csv_rows.append([ann.ID, ann.text, f"test_{ann.ID}.ogg"])
-    chio.write_file(f"./test_data/processed/test_{ann.ID}.txt", ann.text)
-    eaf.cut(ann, f"./test_data/processed/test_{ann.ID}.ogg")
+# one archive instead of one small file per annotation
+with zipfile.ZipFile("./test_data/processed/test_transcripts.zip", "w", zipfile.ZIP_DEFLATED) as transcripts:
+    for ann in eaf["Story"]:
+        csv_rows.append([ann.ID, ann.text, f"test_{ann.ID}.ogg"])
+        transcripts.writestr(f"test_{ann.ID}.txt", ann.text)
+# cut all utterances with a single ffmpeg process
+eaf.cut_all(eaf["Story"], "./test_data/processed/test_{ID}.ogg")
 chio.write_csv("./test_data/processed/test_sentences.csv", csv_rows)
@@ -15,6 +15,7 @@ Latest version can be found at https://github.com/neocl/speach
 # :license: MIT, see LICENSE for more details.
 
 import io
+import os
 from setuptools import setup
 
 
@@ -36,6 +37,16 @@ exec(read('speach/__version__.py'), pkg_info)
 with open('requirements.txt', 'r') as infile:
     requirements = infile.read().splitlines()
 
+# Optionally compile fully annotated helper modules with mypyc (set SPEACH_USE_MYPYC=1 to enable)
+# The pure Python package is built when mypyc is not available
+ext_modules = []
+if os.environ.get('SPEACH_USE_MYPYC'):
+    try:
+        from mypyc.build import mypycify
+        ext_modules = mypycify(['speach/vtt.py'])
+    except ImportError:
+        print("mypyc is not available, speach will be built as a pure Python package")
+
 setup(
     name='speach',
     version=pkg_info['__version__'],
@@ -54,6 +65,7 @@ setup(
                              'data/*.gz',
                              'data/elan/*.eaf']},
     include_package_data=True,
+    ext_modules=ext_modules,
     url=pkg_info['__url__'],
     project_urls={
         "Bug Tracker": "https://github.com/neocl/speach/issues",
@@ -14,9 +14,44 @@ from .__version__ import __author__, __email__, __copyright__, __maintainer__
 from .__version__ import __credits__, __license__, __description__, __url__
 from .__version__ import __version_major__, __version_long__, __version__, __status__
 
-from chirptext import ttl
-from . import ttlig as tig  # expose ttlig as tig
-from .sqlite import TTLSQLite
+import sys as _sys
+
+
+def _import_ttl():
+    from chirptext import ttl
+    return ttl
+
+
+def _import_tig():
+    from . import ttlig as tig  # expose ttlig as tig
+    return tig
+
+
+def _import_ttlsqlite():
+    from .sqlite import TTLSQLite
+    return TTLSQLite
+
+
+# heavy modules are only imported when they are first accessed, e.g. speach.ttl
+_LAZY_ATTRS = {'ttl': _import_ttl, 'tig': _import_tig, 'TTLSQLite': _import_ttlsqlite}
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        value = _LAZY_ATTRS[name]()
+        globals()[name] = value  # cache it so that __getattr__ will not be called again
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
+
+
+if _sys.version_info < (3, 7):
+    # module __getattr__ (PEP 562) is not supported, import everything now
+    for _name in _LAZY_ATTRS:
+        __getattr__(_name)
 
 
 __all__ = ['ttl', 'TTLSQLite', 'tig',
@@ -9,7 +9,9 @@ TTL Tools
 # :license: MIT, see LICENSE for more details.
 
 import os
+import sys
 import logging
+from xml.sax.saxutils import escape
 try:
     from lxml import etree
     _LXML_AVAILABLE = True
@@ -39,6 +41,8 @@ def getLogger():
 
 FORMAT_TTL = 'ttl'
 FORMAT_EXPEX = 'expex'
+BULK_SENT_COUNT = 1000  # number of sentences to be written per bulk insert
+PROGRESS_INTERVAL = 1000  # report progress every n sentences when the total is unknown
 
 
 # ----------------------------------------------------------------------
@@ -50,29 +54,73 @@ def get_doc_length(name, ctx):
     return ctx.select_scalar(query, (name,))
 
 
+def read_ttl_sents(path):
+    """ Read sentences from a TTL document
+
+    TTL-JSON files (one sentence per line) are streamed sentence by sentence,
+    TTL-TXT documents are split into several files and must be read as a whole.
+
+    :return: a tuple of (document name, sentence iterator, number of sentences or None if unknown)
+    """
+    if path.endswith('.json'):
+        doc_name = os.path.splitext(os.path.basename(path))[0]
+        return doc_name, ttl.read_json_iter(path), None
+    else:
+        ttl_doc = ttl.read(path)
+        return ttl_doc.name, iter(ttl_doc), len(ttl_doc)
+
+
 def make_db(cli, args):
-    """ Convert TTL-TXT to TTL-SQLite """
+    """ Convert TTL-TXT or TTL-JSON to TTL-SQLite """
     print("Reading document ...")
-    ttl_doc = ttl.Document.read_ttl(args.ttl)
-    print("Sentences: {}".format(len(ttl_doc)))
+    doc_name, ttl_sents, sent_count = read_ttl_sents(args.ttl)
+    if sent_count is not None:
+        print("Sentences: {}".format(sent_count))
     db = TTLSQLite(args.db)
     db_corpus = db.ensure_corpus(name=args.corpus)
-    db_doc = db.ensure_doc(name=args.doc if args.doc else ttl_doc.name, corpus=db_corpus)
+    db_doc = db.ensure_doc(name=args.doc if args.doc else doc_name, corpus=db_corpus)
     if get_doc_length(db_doc.name, ctx=db.ctx()):
         print("Document is not empty, program aborted.")
     else:
         # insert sents
         with db.ctx() as ctx:
-            ctx.buckmode()
-            ctx.execute('BEGIN;')
-            for idx, sent in enumerate(ttl_doc):
-                if args.topk and args.topk <= idx:
-                    break
-                print("Processing sent #{}/{}".format(idx + 1, len(ttl_doc)))
-                sent.ID = None
-                sent.docID = db_doc.ID
-                db.save_sent(sent, ctx=ctx)
-            ctx.execute('COMMIT;')
+            # insert all sentences in a single transaction
+            ctx.auto_commit = False
+            # indexes are rebuilt once after bulk inserting instead of being updated for every row
+            index_sqls = db.drop_indexes(ctx=ctx) if args.bulk else []
+            try:
+                pending = []
+                # report progress about 100 times in total instead of once per sentence
+                interval = max(1, sent_count // 100) if sent_count else PROGRESS_INTERVAL
+                for idx, sent in enumerate(ttl_sents):
+                    if args.topk and args.topk <= idx:
+                        break
+                    if (idx + 1) % interval == 0 or idx + 1 == sent_count:
+                        if sent_count is not None:
+                            print("Processing sent #{}/{}".format(idx + 1, sent_count), file=sys.stderr)
+                        else:
+                            print("Processing sent #{}".format(idx + 1), file=sys.stderr)
+                    sent.ID = None
+                    sent.docID = db_doc.ID
+                    if not args.bulk:
+                        db.save_sent(sent, ctx=ctx)
+                        continue
+                    pending.append(sent)
+                    if len(pending) >= BULK_SENT_COUNT:
+                        db.save_sents_bulk(pending, ctx=ctx)
+                        pending = []
+                if pending:
+                    db.save_sents_bulk(pending, ctx=ctx)
+                ctx.commit()
+            except BaseException:
+                # do not keep a partially converted document
+                ctx.rollback()
+                raise
+            finally:
+                # DROP INDEX is committed at once, so the indexes must be restored on every exit path
+                for sql in index_sqls:
+                    ctx.execute(sql)
+                ctx.commit()
     print("Done!")
 
 
@@ -155,34 +203,50 @@ def make_text(sent, delimiter=' '):
     frags = []
     if sent.tokens:
         for tk in sent:
-            furi = tk.find('furi', default=None)
+            furi = tk.tag.furi
             if furi:
-                frags.append(ttlig.make_ruby_html(furi.label))
+                frags.append(ttlig.make_ruby_html(furi.value))
             else:
-                frags.append(tk.text)
-    html_text = delimiter.join(frags) if frags else sent.text
+                frags.append(escape(tk.text))
+    html_text = delimiter.join(frags) if frags else escape(sent.text)
     return "<text>{}</text>".format(html_text)
 
 
+def make_text_node(sent, delimiter=' '):
+    """ Build a <text> node for a sentence
+
+    The XML parser is only used for sentences with furigana (ruby markup),
+    other sentences are built directly from their tokens.
+    """
+    if sent.tokens and any(tk.tag.furi for tk in sent):
+        return etree.XML(make_text(sent, delimiter=delimiter))
+    text_node = etree.Element('text')
+    text_node.text = delimiter.join(tk.text for tk in sent) if sent.tokens else sent.text
+    return text_node
+
+
 def make_html(cli, args):
     ''' Convert TTL to HTML '''
     if not _LXML_AVAILABLE:
         print("lxml library is required for this function")
         exit()
     print("Reading document ...")
-    ttl_doc = ttl.Document.read_ttl(args.ttl)
+    _, ttl_sents, _ = read_ttl_sents(args.ttl)
     output = TextReport(args.output)
     doc_node = etree.Element('doc')
-    for sent in ttl_doc:
-        sent_node = etree.SubElement(doc_node, 'sent')
-        text_node = etree.XML(make_text(sent, delimiter=args.delimiter))
-        sent_node.append(text_node)
-        if sent.get_tag('translation'):
+    sent_nodes = []
+    for sent in ttl_sents:
+        sent_node = etree.Element('sent')
+        sent_node.append(make_text_node(sent, delimiter=args.delimiter))
+        translation = sent.tag.translation
+        if translation:
             etree.SubElement(sent_node, 'br')
             trans_node = etree.SubElement(sent_node, 'trans')
-            trans_node.text = sent.get_tag('translation').label
+            trans_node.text = translation.value
         etree.SubElement(sent_node, 'br')
         etree.SubElement(sent_node, 'br')
+        sent_nodes.append(sent_node)
+    doc_node.extend(sent_nodes)
     output.write(etree.tostring(doc_node, encoding='unicode', pretty_print=not args.compact))
 
 
@@ -192,9 +256,10 @@ def sec_str(a_float):
 
 def convert_eaf_to_csv(eaf_path, csv_path, encoding='utf-8'):
     with chio.open(eaf_path) as eaf_stream:
+        # keep_xml=False saves memory but is slower for files of typical sizes, so the DOM parse is kept
         elan = parse_eaf_stream(eaf_stream)
-        rows = elan.to_csv_rows()
-        chio.write_tsv(csv_path, rows, quoting=chio.QUOTE_MINIMAL, encoding=encoding)
+        # rows are written as they are generated instead of being collected in a list first
+        chio.write_tsv(csv_path, elan.iter_csv_rows(), quoting=chio.QUOTE_MINIMAL, encoding=encoding)
 
 
 def eaf_to_csv(cli, args):
@@ -215,11 +280,13 @@ def main():
     app = CLIApp(desc='Speach tools', logger=__name__)
     # add tasks
     task = app.add_task('convert', func=make_db)
-    task.add_argument('ttl', help='TTL file')
+    task.add_argument('ttl', help='TTL file (TTL-TXT document path or a TTL-JSON file)')
     task.add_argument('db', help='TTL DB file')
     task.add_argument('corpus', help='Corpus name')
     task.add_argument('doc', help='Document name', default=None)
     task.add_argument('-k', '--topk', help='Only select the top k frequent elements', default=None, type=int)
+    task.add_argument('--no-bulk', dest='bulk', action='store_false',
+                      help='Insert sentences one at a time instead of in batches using multi-row INSERT statements')
 
     task = app.add_task('ig', func=process_tig)
     task.add_argument('ttlig', help='TTLIG file')
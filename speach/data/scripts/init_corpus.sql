@@ -115,6 +115,7 @@ CREATE INDEX IF NOT EXISTS "document_|_corpusID" ON "document" ("corpusID");
 CREATE INDEX IF NOT EXISTS "sentence_|_text" ON "sentence" ("text");
 CREATE INDEX IF NOT EXISTS "sentence_|_ident" ON "sentence" ("ident");
 CREATE INDEX IF NOT EXISTS "sentence_|_docID" ON "sentence" ("docID");
+CREATE INDEX IF NOT EXISTS "sentence_|_docID_text" ON "sentence" ("docID", "text");
 CREATE INDEX IF NOT EXISTS "sentence_|_flag" ON "sentence" ("flag");
 -- token
 CREATE INDEX IF NOT EXISTS "token_|_sid" ON "token" ("sid");
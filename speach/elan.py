@@ -10,7 +10,12 @@ ELAN module - manipulating ELAN transcript files (\*.eaf, \*.pfsx)
 
 import os
 import sys
+import copy
+import codecs
+import bisect
 import uuid
+import functools
+import threading
 from datetime import datetime
 from io import StringIO
 import logging
@@ -43,7 +48,7 @@ from chirptext import chio
 
 from .__version__ import __issue__
 from .vtt import sec2ts, ts2sec
-from .media import cut
+from .media import cut, cut_segments
 from .data import ELAN_BLANK_FILE
 
 
@@ -69,12 +74,97 @@ def msec2ts(value):
     return sec2ts(value / 1000)
 
 
+@functools.lru_cache(maxsize=65536)
+def _msec2str(value):
+    """ [Internal] Format a millisecond value as seconds with 3 decimals (e.g. 1040 -> '1.040')
+
+    Time slots are shared between annotations of parent and child tiers, so the same values recur.
+    """
+    return f"{value / 1000:.3f}" if value is not None else ''
+
+
+def _annotation_text(value_node, cve_ref=None):
+    """ [Internal] Read the text of an ANNOTATION_VALUE node
+
+    Values from controlled vocabularies repeat throughout a transcript, so they are interned to share one string.
+    """
+    value = value_node.text if value_node.text else ''
+    return sys.intern(value) if cve_ref is not None and len(value) < 256 else value
+
+
+if XML_PARSER == 'lxml':
+    def _find_child(node, tag):
+        """ [Internal] Find the first child node with a given tag
+
+        In EAF files the wanted child (e.g. ANNOTATION_VALUE) is almost always the first one.
+        Checking it directly is much cheaper than lxml's find(), which goes through its path engine.
+        """
+        if len(node) and node[0].tag == tag:
+            return node[0]
+        return node.find(tag)
+else:
+    # the standard library's find() is already faster than the check above, so it is used as is
+    _find_child = etree.Element.find
+
+
+@functools.lru_cache(maxsize=None)
+def _xml_template(content):
+    """ [Internal] Parse an XML template once, callers must not modify the returned node """
+    return best_parser.XML(content)
+
+
+def _new_xml_node(content):
+    """ [Internal] Create a new XML node from a template string
+
+    Copying a parsed template is much cheaper than parsing the same string again for every new node.
+    """
+    return copy.deepcopy(_xml_template(content))
+
+
+_thread_data = threading.local()
+
+
+def _lxml_parser():
+    """ [Internal] Get a reusable lxml parser for the current thread
+
+    lxml parsers must not be shared between threads.
+    External entities and network access are disabled as EAF files never need them.
+    EAF files do not use xml:id either, so lxml does not need to index IDs.
+    """
+    parser = getattr(_thread_data, 'lxml_parser', None)
+    if parser is None:
+        parser = etree.XMLParser(resolve_entities=False, no_network=True, collect_ids=False)
+        _thread_data.lxml_parser = parser
+    return parser
+
+
 def _parse_xml(source):
-    """ [Internal] Parse an XML stream """
+    """ [Internal] Parse an XML stream
+
+    The stream is fed to the parser incrementally instead of being read into a string first
+    """
     if XML_PARSER == 'lxml':
+        return best_parser.parse(source, parser=_lxml_parser()).getroot()
+    else:
         return best_parser.parse(source).getroot()
+
+
+def _iterparse(source, events=('start', 'end')):
+    """ [Internal] Iterate through (event, element) pairs of an XML file path or input stream """
+    if XML_PARSER != 'lxml':
+        yield from best_parser.iterparse(source, events=events)
+    elif not hasattr(source, 'read'):
+        yield from best_parser.iterparse(source, events=events, resolve_entities=False, no_network=True,
+                                         collect_ids=False)
     else:
-        return best_parser.fromstring(source.read())
+        # lxml.etree.iterparse() only accepts binary streams, a pull parser accepts text as well
+        parser = best_parser.XMLPullParser(events=events, resolve_entities=False, no_network=True,
+                                           collect_ids=False)
+        for chunk in iter(lambda: source.read(65536), source.read(0)):
+            parser.feed(chunk)
+            yield from parser.read_events()
+        parser.close()
+        yield from parser.read_events()
 
 
 def _xml_tostring(root, encoding='utf-8',
@@ -102,6 +192,20 @@ def _xml_tostring(root, encoding='utf-8',
         return _content
 
 
+def _xml_write(root, stream, encoding='utf-8',
+               method="xml",
+               pretty_print=False,
+               short_empty_elements=True, *args, **kwargs):
+    """ [Internal] Write XML content to a binary output stream """
+    if XML_PARSER == 'lxml' or pretty_print:
+        stream.write(_xml_tostring(root, encoding=encoding, method=method, pretty_print=pretty_print,
+                                   short_empty_elements=short_empty_elements, *args, **kwargs))
+    else:
+        # serialise straight into the stream instead of building the whole document in memory first
+        etree.ElementTree(root).write(stream, encoding=encoding, method=method,
+                                      short_empty_elements=short_empty_elements, *args, **kwargs)
+
+
 # ----------------------------------------------------------------------
 # Models
 # ----------------------------------------------------------------------
@@ -212,15 +316,30 @@ class ExternalRef(DataObject):
         return ExternalRef(xml_node=xml_node, **kwargs)
 
 
+@functools.total_ordering
 class TimeSlot:
 
+    # there is one TimeSlot per time point in a transcript, slots keep them small
+    __slots__ = ('__xml_node', '__ID', '__value', '__sec', '__ts', '__tiers')
+
     def __init__(self, xml_node=None, ID=None, value=None, *args, **kwargs):
         """ An ELAN timestamp
         """
         self.__xml_node = xml_node
-        self.__ID = xml_node.get('TIME_SLOT_ID') if xml_node is not None else ID
-        _v = xml_node.get('TIME_VALUE') if xml_node is not None else value
-        self.__value = int(_v) if _v else None
+        if xml_node is not None:
+            attrs = xml_node.attrib
+            ID = attrs.get('TIME_SLOT_ID')
+            value = attrs.get('TIME_VALUE')
+        self.__ID = ID
+        self.__tiers = None  # internal - tiers with a cached time index that uses this slot
+        self.__set_value(int(value) if value is not None and value != '' else None)
+
+    def __set_value(self, value):
+        """ [Internal] Update value and cached representations """
+        self.__value = value
+        # seconds are read for every annotation when exporting, compute them once
+        self.__sec = value / 1000 if value is not None else None
+        self.__ts = None  # formatted lazily by the ts property
 
     @property
     def ID(self):
@@ -236,7 +355,18 @@ class TimeSlot:
         # TODO: update DOM to be able to save
         if isinstance(value, float):
             value = round(value)
-        self.__value = value
+        self.__set_value(value)
+        if self.__tiers:
+            for tier in self.__tiers:
+                tier._reset_time_index()
+            self.__tiers = None
+
+    def _watch(self, tier):
+        """ [Internal] Reset the time index of a tier when the value of this slot is changed """
+        if self.__tiers is None:
+            self.__tiers = [tier]
+        elif tier not in self.__tiers:
+            self.__tiers.append(tier)
 
     @property
     def ts(self) -> str:
@@ -244,39 +374,36 @@ class TimeSlot:
 
         :return: An empty string will be returned if TimeSlot value is None
         """
-        return sec2ts(self.sec) if self.value is not None else ''
+        if self.__ts is None:
+            self.__ts = sec2ts(self.__sec) if self.__value is not None else ''
+        return self.__ts
 
     @property
     def sec(self):
         """ Get TimeSlot value in seconds """
-        return self.value / 1000 if self.value is not None else None
-
-    def __lt__(self, other):
-        if other is None or (isinstance(other, TimeSlot) and other.value is None):
-            return False
-        elif self.value is None:
-            return True
-        return self.value < other.value if isinstance(other, TimeSlot) else self.value < other
+        return self.__sec
 
     def __eq__(self, other):
-        if other is None:
+        if type(other) is TimeSlot:
+            # fast path, read the slot directly instead of going through the property
+            return self.__value == other.__value
+        elif other is None:
             return False
-        elif isinstance(other, TimeSlot):
-            return other.value == self.value
-        return self.value == other.value if isinstance(other, TimeSlot) else self.value == other
+        return self.__value == (other.value if isinstance(other, TimeSlot) else other)
 
-    def __gt__(self, other):
-        if other is None or (isinstance(other, TimeSlot) and other.value is None):
-            return True
-        elif self.value is None:
+    def __lt__(self, other):
+        # TimeSlots without value are placed before all others, and None is smaller than everything
+        if type(other) is TimeSlot:
+            _ov = other.__value
+        elif other is None:
             return False
-        return self.value > other.value if isinstance(other, TimeSlot) else self.value > other
-
-    def __le__(self, other):
-        return self < other or self == other
-
-    def __ge__(self, other):
-        return self > other or self == other
+        else:
+            _ov = other.value if isinstance(other, TimeSlot) else other
+        if _ov is None:
+            return False
+        elif self.__value is None:
+            return True
+        return self.__value < _ov
 
     def __add__(self, other):
         sv = self.value if self.value is not None else 0
@@ -299,6 +426,7 @@ class TimeSlot:
         return sv - ov
 
     def __hash__(self):
+        # TimeSlots are mutable and compare equal by value, so they are hashed by identity
         return id(self)
 
     def __repr__(self):
@@ -399,7 +527,17 @@ class TimeAnnotation(Annotation):
         """ Calculate overlap score between two time annotations
         Score = 0 means adjacent, score > 0 means overlapped, score < 0 means no overlap (the distance between the two)
         """
-        return min(self.to_ts, other.to_ts) - max(self.from_ts, other.from_ts)
+        # compare integer milliseconds directly, time slots without value count as 0 as in TimeSlot.__sub__
+        a, b = self.to_ts.value, other.to_ts.value
+        c, d = self.from_ts.value, other.from_ts.value
+        _to = 0 if a is None or b is None else (a if a < b else b)
+        if c is None:
+            _from = d or 0
+        elif d is None:
+            _from = c
+        else:
+            _from = c if c > d else d
+        return _to - _from
 
     def __repr__(self):
         return '[{} -- {}] {}'.format(self.from_ts, self.to_ts, self.value)
@@ -452,11 +590,13 @@ class LinguisticType(DataObject):
     """
 
     def __init__(self, xml_node=None):
+        super().__init__()
         self.__xml_node = xml_node
-        data = {k.lower(): v for k, v in xml_node.attrib.items()} if xml_node is not None else {}
-        if "time_alignable" in data:
-            data["time_alignable"] = data["time_alignable"] == "true"
-        super().__init__(**data)
+        if xml_node is not None:
+            # XML attributes become fields, e.g. LINGUISTIC_TYPE_ID -> linguistic_type_id
+            for k, v in xml_node.attrib.items():
+                k = k.lower()
+                setattr(self, k, v == "true" if k == 'time_alignable' else v)
         self.vocab = None
         self.tiers = []
 
@@ -479,6 +619,25 @@ class LinguisticType(DataObject):
         return self.ID
 
 
+class _AnnotationList(list):
+    """ [Internal] A list of annotations that counts in-place changes so that cached tier indexes can be rebuilt """
+
+    _version = 0
+
+
+def _counted(method):
+    def _method(self, *args, **kwargs):
+        self._version += 1
+        return method(self, *args, **kwargs)
+    _method.__name__ = method.__name__
+    return _method
+
+
+for _name in ('append', 'extend', 'insert', 'pop', 'remove', 'clear', 'sort', 'reverse',
+              '__setitem__', '__delitem__', '__iadd__', '__imul__'):
+    setattr(_AnnotationList, _name, _counted(getattr(list, _name)))
+
+
 class Tier(DataObject):
     """ Represents an ELAN annotation tier """
 
@@ -495,11 +654,16 @@ class Tier(DataObject):
         super().__init__(**kwargs)
         self.doc = doc
         self.children = []
-        self.__annotations = []
+        self.__child_map = None  # internal - map child tier IDs to tier objects
+        self.__type_ref = None  # internal - cached LinguisticType object
+        self.__ref_index = None  # internal - map referent annotation IDs to ref annotations
+        self.__annotations = _AnnotationList()
+        self.__time_index = None
         self.__xml_node = xml_node
         if xml_node is not None:
             self.__type_ref_id = xml_node.get('LINGUISTIC_TYPE_REF')
-            self.__participant = xml_node.get('PARTICIPANT', '')
+            # the same participant code is shared by many tiers
+            self.__participant = sys.intern(xml_node.get('PARTICIPANT', ''))
             self.__ID = xml_node.get('TIER_ID')
             self.__parent_ref = xml_node.get('PARENT_REF') if xml_node.get('PARENT_REF') else None  # ID of parent tier
             self.__default_locale = xml_node.get('DEFAULT_LOCALE')
@@ -521,6 +685,8 @@ class Tier(DataObject):
             self.__ID = value
             if self.doc is not None:
                 self.doc._reset_tier_map()
+                if self.parent is not None:
+                    self.parent._reset_child_map()
             if self.__xml_node is not None:
                 self.__xml_node.set('TIER_ID', value)
                 for child in self.children:
@@ -542,7 +708,8 @@ class Tier(DataObject):
     @property
     def time_alignable(self):
         """ Check if this tier contains time alignable annotations """
-        return self.linguistic_type and self.linguistic_type.time_alignable
+        lingtype = self.type_ref
+        return lingtype and lingtype.time_alignable
 
     @property
     def participant(self):
@@ -571,6 +738,8 @@ class Tier(DataObject):
         if self.__xml_node is not None:
             self.__xml_node.set('PARENT_REF', value)
         self.__parent_ref = value
+        if self.doc is not None:
+            self.doc._reset_roots()
 
     @property
     def type_ref_id(self):
@@ -580,7 +749,10 @@ class Tier(DataObject):
     @property
     def type_ref(self) -> LinguisticType:
         """ Tier type object """
-        return self.doc.get_linguistic_type(self.__type_ref_id)
+        # tier type IDs do not change, so the type object is looked up only once
+        if self.__type_ref is None and self.doc is not None:
+            self.__type_ref = self.doc.get_linguistic_type(self.__type_ref_id)
+        return self.__type_ref
 
     @property
     def linguistic_type(self) -> LinguisticType:
@@ -593,8 +765,9 @@ class Tier(DataObject):
 
     @property
     def vocab(self):
-        if self.type_ref is not None and self.type_ref.vocab is not None:
-            return self.type_ref.vocab
+        lingtype = self.type_ref
+        if lingtype is not None and lingtype.vocab is not None:
+            return lingtype.vocab
         else:
             return None
 
@@ -610,22 +783,89 @@ class Tier(DataObject):
 
     def get_child(self, ID):
         """ Get a child tier by ID, return None if nothing is found """
-        for child in self.children:
-            if child.ID == ID:
-                return child
-        return None
+        # rebuild the map when children were added to the list directly
+        if self.__child_map is None or len(self.__child_map) != len(self.children):
+            self.__child_map = {child.ID: child for child in self.children}
+        return self.__child_map.get(ID)
+
+    def _add_child(self, tier):
+        """ [Internal] Link a child tier to this tier """
+        self.children.append(tier)
+        self.__child_map = None
+
+    def _reset_child_map(self):
+        """ [Internal] Drop the child map after a child tier has been renamed """
+        self.__child_map = None
+
+    def _ref_children(self, ann_ref_id):
+        """ [Internal] Get ref annotations of this tier that refer to a given annotation ID, in tier order
+
+        The index is built on first use and then kept up to date when ref annotations are added.
+        """
+        if self.__ref_index is None:
+            self.__ref_index = dd(list)
+            for ann in self.__annotations:
+                if isinstance(ann, RefAnnotation):
+                    self.__ref_index[ann.ref_id].append(ann)
+        return self.__ref_index.get(ann_ref_id, ())
+
+    def _time_index(self):
+        """ [Internal] Index annotations of this tier by start time (in milliseconds)
+
+        Returns a tuple (sorted start times, annotation positions in the same order,
+        positions of annotations without time information, whether positions are already in order,
+        end times by annotation position).
+        Unaligned time slots are treated as -inf.
+        The index is cached until the annotation list is changed or the value of a TimeSlot in this tier is changed.
+        """
+        _key = self.__annotations._version
+        if self.__time_index is None or self.__time_index[0] != _key:
+            timed = []
+            untimed = []
+            ends = []
+            for idx, ann in enumerate(self.__annotations):
+                from_ts, to_ts = ann.from_ts, ann.to_ts
+                if from_ts is None:
+                    untimed.append(idx)
+                else:
+                    from_ts._watch(self)
+                    timed.append((float('-inf') if from_ts.value is None else from_ts.value, idx))
+                if to_ts is None:
+                    ends.append(float('-inf'))
+                else:
+                    to_ts._watch(self)
+                    ends.append(float('-inf') if to_ts.value is None else to_ts.value)
+            in_order = all(timed[i - 1][0] <= timed[i][0] for i in range(1, len(timed)))
+            if not in_order:
+                timed.sort()
+            self.__time_index = (_key, [t for t, _ in timed], [i for _, i in timed], untimed, in_order, ends)
+        return self.__time_index[1:]
+
+    def _reset_time_index(self):
+        """ [Internal] Drop the time index after a TimeSlot value has been changed """
+        self.__time_index = None
 
     def filter(self, from_ts=None, to_ts=None):
         """ Filter utterances by from_ts or to_ts or both
+        Annotations that start at or after from_ts and end at or before to_ts will be returned in their original order.
+        Time values are in milliseconds.
         If this tier is not a time-based tier everything will be returned
         """
-        for ann in self.annotations:
-            if from_ts is not None and ann.from_ts is not None and ann.from_ts < from_ts:
-                continue
-            elif to_ts is not None and ann.to_ts is not None and ann.from_ts > to_ts:
-                continue
-            else:
-                yield ann
+        lo = from_ts.value if isinstance(from_ts, TimeSlot) else from_ts
+        hi = to_ts.value if isinstance(to_ts, TimeSlot) else to_ts
+        starts, positions, untimed, in_order, ends = self._time_index()
+        # binary search on the sorted start times instead of comparing every annotation,
+        # an annotation that ends before to_ts must also start before it
+        first = 0 if lo is None else bisect.bisect_left(starts, lo)
+        last = len(starts) if hi is None else bisect.bisect_right(starts, hi)
+        selected = positions[first:last]
+        if hi is not None:
+            selected = [idx for idx in selected if ends[idx] <= hi]
+        if untimed or not in_order:
+            selected = sorted(selected + untimed)
+        annotations = self.annotations
+        for idx in selected:
+            yield annotations[idx]
 
     def __len__(self):
         return len(self.annotations)
@@ -705,7 +945,7 @@ class Tier(DataObject):
                 if ann_ref.from_ts > float(from_ts) or ann_ref.to_ts < float(to_ts):
                     raise ValueError("New annotation must be contained within the referent annotation")
             cve_ref = self._validate_value(value)
-            ann_node = best_parser.XML(""" <ANNOTATION>
+            ann_node = _new_xml_node(""" <ANNOTATION>
             <ALIGNABLE_ANNOTATION ANNOTATION_ID=""
             TIME_SLOT_REF1="" TIME_SLOT_REF2="">
             <ANNOTATION_VALUE></ANNOTATION_VALUE>
@@ -719,9 +959,7 @@ class Tier(DataObject):
             ann_info.find('ANNOTATION_VALUE').text = value
             ann_info.set('ANNOTATION_ID', self.doc.new_annotation_id())
             self.__xml_node.append(ann_node)
-            ann_obj = self._add_annotation_xml(ann_node)
-            self.doc._register_ann(ann_obj)
-            return ann_obj
+            return self._add_annotation_xml(ann_node)
         elif self.stereotype in ('Time_Subdivision', 'Symbolic_Subdivision'):
             _values = [value] if value is not None else []
             if values:
@@ -731,16 +969,15 @@ class Tier(DataObject):
             if self.stereotype == 'Symbolic_Subdivision':
                 last_id = None
                 previous_ids = set()
-                for ann in self:
-                    if ann.ref.ID == ann_ref_id:
-                        if ann.previous and ann.previous.ID not in previous_ids:
-                            raise ValueError("Corrupted Time_Subdivision tier")
-                        last_id = ann.ID
-                        previous_ids.add(ann.ID)
+                for ann in self._ref_children(ann_ref_id):
+                    if ann.previous and ann.previous not in previous_ids:
+                        raise ValueError("Corrupted Time_Subdivision tier")
+                    last_id = ann.ID
+                    previous_ids.add(ann.ID)
                 # create new nodes
                 ann_objs = []
                 for v in _values:
-                    ann_node = best_parser.XML("""<ANNOTATION>
+                    ann_node = _new_xml_node("""<ANNOTATION>
                     <REF_ANNOTATION ANNOTATION_ID="" ANNOTATION_REF="">
                     <ANNOTATION_VALUE></ANNOTATION_VALUE>
                     </REF_ANNOTATION>
@@ -758,8 +995,7 @@ class Tier(DataObject):
                     last_id = _nid
                     self.__xml_node.append(ann_node)
                     ann_obj = self._add_annotation_xml(ann_node)
-                    ann_obj.resolve(self.doc)
-                    self.doc._register_ann(ann_obj)
+                    self.doc._resolve_refs()
                     ann_objs.append(ann_obj)
                 return ann_objs
             else:
@@ -777,7 +1013,7 @@ class Tier(DataObject):
                 ts_objs.append(ann_ref.to_ts.ID)
                 ann_objs = []
                 for idx, v in enumerate(_values):
-                    ann_node = best_parser.XML("""<ANNOTATION>
+                    ann_node = _new_xml_node("""<ANNOTATION>
                     <ALIGNABLE_ANNOTATION ANNOTATION_ID=""
                     TIME_SLOT_REF1="" TIME_SLOT_REF2="">
                     <ANNOTATION_VALUE></ANNOTATION_VALUE>
@@ -792,15 +1028,12 @@ class Tier(DataObject):
                     ann_info.set('TIME_SLOT_REF2', ts_objs[idx + 1])
                     ann_info.set('ANNOTATION_ID', self.doc.new_annotation_id())
                     self.__xml_node.append(ann_node)
-                    ann_obj = self._add_annotation_xml(ann_node)
-                    self.doc._register_ann(ann_obj)
-
-                    ann_objs.append(ann_obj)
+                    ann_objs.append(self._add_annotation_xml(ann_node))
                 return ann_objs
                 # create new annotation    
         elif self.stereotype == 'Symbolic_Association':
             cve_ref = self._validate_value(value)
-            ann_node = best_parser.XML("""        <ANNOTATION>
+            ann_node = _new_xml_node("""        <ANNOTATION>
             <REF_ANNOTATION ANNOTATION_ID="" ANNOTATION_REF="">
             <ANNOTATION_VALUE></ANNOTATION_VALUE>
             </REF_ANNOTATION>
@@ -813,47 +1046,53 @@ class Tier(DataObject):
             ann_info.set('ANNOTATION_ID', self.doc.new_annotation_id())
             self.__xml_node.append(ann_node)
             ann_obj = self._add_annotation_xml(ann_node)
-            ann_obj.resolve(self.doc)
-            self.doc._register_ann(ann_obj)
+            self.doc._resolve_refs()
             return ann_obj
         else:
             raise NotImplementedError(f"Adding new annotation for {self.stereotype} tiers is yet to be implemented")
 
     def add_alignable_annotation_xml(self, alignable):
-        ann_id = alignable.get('ANNOTATION_ID')
-        from_ts_id = alignable.get('TIME_SLOT_REF1')
-        cve_ref = alignable.get('CVE_REF')  # controlled vocab ref
-        if from_ts_id not in self.doc.time_order:
+        # this runs once per annotation when reading, so lookups are bound to locals
+        attrs = alignable.attrib
+        time_order = self.doc.time_order
+        ann_id = attrs.get('ANNOTATION_ID')
+        from_ts_id = attrs.get('TIME_SLOT_REF1')
+        cve_ref = attrs.get('CVE_REF')  # controlled vocab ref
+        from_ts = time_order.get(from_ts_id)
+        if from_ts is None:
             raise ValueError("Time slot ID not found ({})".format(from_ts_id))
-        else:
-            from_ts = self.doc.time_order[from_ts_id]
-        to_ts_id = alignable.get('TIME_SLOT_REF2')
-        if to_ts_id not in self.doc.time_order:
+        to_ts_id = attrs.get('TIME_SLOT_REF2')
+        to_ts = time_order.get(to_ts_id)
+        if to_ts is None:
             raise ValueError("Time slot ID not found ({})".format(to_ts_id))
-        else:
-            to_ts = self.doc.time_order[to_ts_id]
         # [TODO] ensure that from_ts < to_ts
-        value_node = alignable.find('ANNOTATION_VALUE')
+        value_node = _find_child(alignable, 'ANNOTATION_VALUE')
         if value_node is None:
             raise ValueError("ALIGNABLE_ANNOTATION node must contain an ANNOTATION_VALUE node")
         else:
-            value = value_node.text if value_node.text else ''
+            value = _annotation_text(value_node, cve_ref)
             anno = TimeAnnotation(ann_id, from_ts, to_ts, value, cve_ref=cve_ref, xml_node=alignable)
-            self.annotations.append(anno)
+            self.__annotations.append(anno)
+            self.doc._register_ann(anno)
             return anno
 
     def add_ref_annotation_xml(self, ref_node):
-        ann_id = ref_node.get('ANNOTATION_ID')
-        ref = ref_node.get('ANNOTATION_REF')
-        previous = ref_node.get('PREVIOUS_ANNOTATION')
-        cve_ref = ref_node.get('CVE_REF')  # controlled vocab ref
-        value_node = ref_node.find('ANNOTATION_VALUE')
+        attrs = ref_node.attrib
+        ann_id = attrs.get('ANNOTATION_ID')
+        ref = attrs.get('ANNOTATION_REF')
+        previous = attrs.get('PREVIOUS_ANNOTATION')
+        cve_ref = attrs.get('CVE_REF')  # controlled vocab ref
+        value_node = _find_child(ref_node, 'ANNOTATION_VALUE')
         if value_node is None:
             raise ValueError("REF_ANNOTATION node must contain an ANNOTATION_VALUE node")
         else:
-            value = value_node.text if value_node.text else ''
+            value = _annotation_text(value_node, cve_ref)
             anno = RefAnnotation(ann_id, ref, previous, value, cve_ref=cve_ref, xml_node=ref_node)
-            self.annotations.append(anno)
+            self.__annotations.append(anno)
+            if self.__ref_index is not None:
+                self.__ref_index.setdefault(ref, []).append(anno)
+            if self.doc is not None:
+                self.doc._register_ann(anno)
             return anno
 
     def _add_annotation_xml(self, annotation_node) -> Annotation:
@@ -861,11 +1100,11 @@ class Tier(DataObject):
 
         General users should not use this function.
         """
-        alignable = annotation_node.find('ALIGNABLE_ANNOTATION')
+        alignable = _find_child(annotation_node, 'ALIGNABLE_ANNOTATION')
         if alignable is not None:
             return self.add_alignable_annotation_xml(alignable)
         else:
-            ref_ann_node = annotation_node.find('REF_ANNOTATION')
+            ref_ann_node = _find_child(annotation_node, 'REF_ANNOTATION')
             if ref_ann_node is not None:
                 return self.add_ref_annotation_xml(ref_ann_node)
             else:
@@ -881,7 +1120,9 @@ class CVEntry(DataObject):
         if xml_node is not None:
             self.__ID = xml_node.get('CVE_ID')
             self.__entry_value_node = xml_node.find('CVE_VALUE')
-            self.__lang_ref = self.__entry_value_node.get('LANG_REF')
+            # the same few language codes are repeated in every entry
+            _lang_ref = self.__entry_value_node.get('LANG_REF')
+            self.__lang_ref = sys.intern(_lang_ref) if _lang_ref is not None else None
             self.__value = self.__entry_value_node.text
             self.__description = self.__entry_value_node.get('DESCRIPTION')
         else:
@@ -946,15 +1187,19 @@ class ControlledVocab(DataObject):
         self.__xml_node = xml_node
         if xml_node is not None:
             self.__ID = xml_node.get('CV_ID')
-            self.__entries = []
+            entries_map = self.__entries_map
+            values_map = self.__values_map
             for child in xml_node:
                 if child.tag == 'DESCRIPTION':
                     self.__description_node = child
                     self.__description = child.text
                     self.__lang_ref = child.get('LANG_REF')
                 elif child.tag == 'CV_ENTRY_ML':
+                    # entries are read in document order, so they are indexed directly
                     cv_entry = CVEntry(child)
-                    self._add_child(cv_entry)
+                    self.__entries.append(cv_entry)
+                    entries_map[cv_entry.ID] = cv_entry
+                    values_map[cv_entry.value] = cv_entry
 
     def _add_child(self, child, prev_entry=None, next_entry=None, **kwargs):
         if prev_entry is not None:
@@ -1241,10 +1486,14 @@ class Doc(DataObject):
         self.time_order = OrderedDict()
         self.__tiers = []
         self.__tier_map = OrderedDict()  # internal - map tierIDs to tier objects
+        self.__roots = None  # internal - cached root tiers
         self.__ann_map = dict()
+        self.__unresolved_anns = []  # ref annotations waiting to be linked
         self.__linguistic_types = []
+        self.__linguistic_type_map = dict()  # map type IDs to linguistic type objects
         self.__constraints = []
         self.__vocabs = []
+        self.__vocab_map = dict()  # map CV_IDs to controlled vocabulary objects
         self.__licenses = []
         self.__external_refs = []
         self.__languages = []
@@ -1333,7 +1582,9 @@ class Doc(DataObject):
     @property
     def roots(self) -> Tuple[Tier]:
         """ All root-level tiers in this ELAN doc """
-        return tuple(t for t in self if not t.parent_ref)
+        if self.__roots is None:
+            self.__roots = tuple(t for t in self.__tiers if not t.parent_ref)
+        return self.__roots
 
     @property
     def vocabs(self) -> Tuple[ControlledVocab]:
@@ -1352,10 +1603,7 @@ class Doc(DataObject):
 
     def get_linguistic_type(self, type_id):
         """ Get linguistic type by ID. Return None if can not be found """
-        for lingtype in self.__linguistic_types:
-            if lingtype.linguistic_type_id == type_id:
-                return lingtype
-        return None
+        return self.__linguistic_type_map.get(type_id)
 
     def _find_last_element_index(self, tag_name):
         """ [Internal] """
@@ -1390,10 +1638,7 @@ class Doc(DataObject):
 
     def get_vocab(self, vocab_id):
         """ Get controlled vocab list by ID """
-        for vocab in self.__vocabs:
-            if vocab.ID == vocab_id:
-                return vocab
-        return None
+        return self.__vocab_map.get(vocab_id)
 
     def new_vocab(self, vocab_id, language=None):
         if not vocab_id:
@@ -1437,7 +1682,7 @@ class Doc(DataObject):
         Return a map from participant name to a list of corresponding tiers
         """
         par_map = dd(list)
-        for t in self.tiers():
+        for t in self.__tiers:
             par_map[t.participant].append(t)
         return par_map
 
@@ -1464,6 +1709,10 @@ class Doc(DataObject):
         """
         self.__tier_map = None
 
+    def _reset_roots(self):
+        """ [Internal] Drop cached root tiers after a tier has been added or moved """
+        self.__roots = None
+
     def new_tier(self, tier_id, type_id, parent_id=None, participant=None, annotator=None):
         if tier_id is None:
             raise ValueError("Tier ID cannot be blank")
@@ -1493,7 +1742,7 @@ class Doc(DataObject):
         self.__xml_root.insert(idx, tier_node)
         tier_obj = self._add_tier_xml(tier_node)
         if parent_tier is not None:
-            self[tier_obj.parent_ref].children.append(tier_obj)
+            self[tier_obj.parent_ref]._add_child(tier_obj)
         return tier_obj
 
     @property
@@ -1568,6 +1817,7 @@ class Doc(DataObject):
             raise ValueError(f"Duplicated tier ID ({tier.ID})")
         self.__tiers.append(tier)
         self.tier_map[tier.ID] = tier
+        self.__roots = None
         return tier
 
     def _add_timeslot_xml(self, timeslot_node):
@@ -1586,6 +1836,8 @@ class Doc(DataObject):
         """
         lt = LinguisticType(elem)
         self.__linguistic_types.append(lt)
+        # the first linguistic type with a given ID wins, as with the previous linear search
+        self.__linguistic_type_map.setdefault(lt.linguistic_type_id, lt)
         return lt
 
     def _add_constraint_xml(self, elem):
@@ -1602,6 +1854,7 @@ class Doc(DataObject):
         """
         cv = ControlledVocab(elem)
         self.__vocabs.append(cv)
+        self.__vocab_map.setdefault(cv.ID, cv)
         return cv
 
     def _add_license_xml(self, elem):
@@ -1633,8 +1886,42 @@ class Doc(DataObject):
         self.__locale = Locale(elem)
 
     def _register_ann(self, ann):
-        """ [Internal] """
+        """ [Internal] Index an annotation by its ID
+
+        Ref annotations are linked to their referent annotations later by _resolve_refs()
+        because referent annotations may appear after them in the file.
+        """
         self.__ann_map[ann.ID] = ann
+        # check the type first, ref_id on a TimeAnnotation goes through the slow DataObject.__getattr__
+        if isinstance(ann, RefAnnotation) and ann.ref_id and ann.ref is None:
+            self.__unresolved_anns.append(ann)
+
+    def _resolve_refs(self):
+        """ [Internal] Link registered ref annotations to their referent annotations """
+        while self.__unresolved_anns:
+            self.__unresolved_anns.pop().resolve(self)
+
+    def iter_csv_rows(self):
+        """ Iterate through CSV rows of this ELAN Doc, one row at a time
+
+        Use this instead of :meth:`to_csv_rows` to write rows out without building a list first
+
+        >>> chio.write_tsv("output.tsv", eaf.iter_csv_rows())
+
+        :return: An iterator of tuples of strings (tier ID, participant, from, to, duration, value)
+        """
+        for tier in self.__tiers:
+            tier_id, participant = tier.ID, tier.participant
+            for anno in tier.annotations:
+                from_ts, to_ts = anno.from_ts, anno.to_ts
+                if from_ts is None or to_ts is None:
+                    # unresolved ref annotations have no time information
+                    yield (tier_id, participant, '', '', '', anno.value)
+                    continue
+                from_ms, to_ms = from_ts.value, to_ts.value
+                # duration is computed on integer milliseconds so that the cached formatter can be used
+                yield (tier_id, participant, _msec2str(from_ms), _msec2str(to_ms),
+                       _msec2str((to_ms or 0) - (from_ms or 0)), anno.value)
 
     def to_csv_rows(self) -> List[List[str]]:
         """ Convert this ELAN Doc into a CSV-friendly structure (i.e. list of list of strings)
@@ -1642,14 +1929,7 @@ class Doc(DataObject):
         :return: A list of list of strings
         :rtype: List[List[str]]
         """
-        rows = []
-        for tier in self.tiers():
-            for anno in tier.annotations:
-                _from_ts = f"{anno.from_ts.sec:.3f}" if anno.from_ts is not None else ''
-                _to_ts = f"{anno.to_ts.sec:.3f}" if anno.to_ts is not None else ''
-                _duration = f"{anno.duration:.3f}" if anno.duration is not None else ''
-                rows.append((tier.ID, tier.participant, _from_ts, _to_ts, _duration, anno.value))
-        return rows
+        return list(self.iter_csv_rows())
 
     def to_xml_bin(self, encoding='utf-8',
                    default_namespace=None,
@@ -1659,6 +1939,8 @@ class Doc(DataObject):
         :returns: EAF content
         :rtype: bytes
         """
+        if self.__xml_root is None:
+            raise ValueError("This document was read without its XML tree (keep_xml=False) and cannot be saved")
         _content = _xml_tostring(self.__xml_root,
                                  encoding=encoding,
                                  default_namespace=default_namespace,
@@ -1668,18 +1950,29 @@ class Doc(DataObject):
 
     def to_xml_str(self, encoding='utf-8', *args, **kwargs):
         """ Generate EAF content string in XML format """
+        if self.__xml_root is None:
+            raise ValueError("This document was read without its XML tree (keep_xml=False) and cannot be saved")
+        if not args and not kwargs:
+            # serialise to text directly instead of encoding to bytes and decoding them again
+            return etree.tostring(self.__xml_root, encoding='unicode')
         return _xml_tostring(self.__xml_root,
                              *args, **kwargs).decode(encoding=encoding)
 
     def save(self, path, encoding='utf-8', xml_declaration=None,
-             default_namespace=None, short_empty_elements=True, *args, **kwargs):
-        """ Write ELAN Doc to an EAF file """
-        _content = self.to_xml_str(encoding=encoding,
-                                   xml_declaration=xml_declaration,
-                                   default_namespace=default_namespace,
-                                   short_empty_elements=short_empty_elements,
-                                   *args, **kwargs)
-        chio.write_file(path, _content, encoding=encoding)
+             short_empty_elements=True, *args, **kwargs):
+        """ Write ELAN Doc to an EAF file
+
+        :raises: TypeError if default_namespace is given, EAF elements are not namespaced
+        """
+        if 'default_namespace' in kwargs:
+            raise TypeError("save() does not support default_namespace, EAF elements are not namespaced")
+        if self.__xml_root is None:
+            raise ValueError("This document was read without its XML tree (keep_xml=False) and cannot be saved")
+        with chio.open(path, mode='wb') as outfile:
+            _xml_write(self.__xml_root, outfile, encoding=encoding,
+                       xml_declaration=xml_declaration,
+                       short_empty_elements=short_empty_elements,
+                       *args, **kwargs)
 
     def clone(self, *args, **kwargs):
         """ Clone this ELAN object by using the save() action """
@@ -1709,94 +2002,185 @@ class Doc(DataObject):
             raise FileNotFoundError(f"Source media file ({media_file}) could not be found")
         cut(media_file, outfile, from_ts=section.from_ts, to_ts=section.to_ts, use_concat=use_concat, *args, **kwargs)
 
+    def cut_all(self, sections, out_pattern, media_file=None, *args, **kwargs):
+        """ Cut the source media into one file for each section with a single ffmpeg process
+
+        For example, the following code cut all annotations in tier "Tier 1" into audio files named by annotation IDs
+
+        >>> eaf.cut_all(eaf["Tier 1"], "tier1_{ID}.ogg")
+
+        When some sections overlap, each section will be cut separately with :meth:`Doc.cut` instead.
+
+        :param sections: A list of objects with ``ID``, ``from_ts`` and ``to_ts`` attributes
+        :param out_pattern: Output file pattern, ``{ID}`` will be replaced with section IDs
+        :param media_file: Use to specify source media file. This will override the value specified in source EAF file
+        :return: A list of output file paths
+        :raises: FileExistsError, ValueError
+        """
+        sections = list(sections)
+        if any(s is None or s.from_ts is None or s.to_ts is None or s.from_ts.value is None or s.to_ts.value is None
+               for s in sections):
+            raise ValueError("Annotation objects must be time-alignable")
+        elif media_file is None:
+            media_file = self.media_path()
+        if not os.path.isfile(media_file):
+            raise FileNotFoundError(f"Source media file ({media_file}) could not be found")
+        outfiles = [str(out_pattern).format(ID=s.ID) for s in sections]
+        spans = sorted((s.from_ts.value, s.to_ts.value) for s in sections)
+        if any(spans[i][0] < spans[i - 1][1] for i in range(1, len(spans))):
+            for section, outfile in zip(sections, outfiles):
+                self.cut(section, outfile, media_file, False, *args, **kwargs)
+        else:
+            cut_segments(media_file, [(s.from_ts.sec, s.to_ts.sec) for s in sections], outfiles, *args, **kwargs)
+        return outfiles
+
+    def _update_root_xml(self, root):
+        """ [Internal] Read ELAN file metadata from the root ANNOTATION_DOCUMENT node
+
+        General users should not use this function.
+        """
+        self.__author = root.get('AUTHOR')
+        self.__date = root.get('DATE')
+        self.fileformat = root.get('FORMAT')
+        self.version = root.get('VERSION')
+
+    def _parse_node(self, elem):
+        """ [Internal] Parse a top-level XML node (a child of the root node)
+
+        General users should not use this function.
+        """
+        tag = elem.tag  # lxml builds a new string each time the tag is read
+        if tag == 'HEADER':
+            self._update_header_xml(elem)
+        elif tag == 'TIME_ORDER':
+            self.__xml_time_order_node = elem
+            # build all time slots in one pass, there is usually one per annotation boundary
+            self.time_order.update((ts.ID, ts) for ts in map(TimeSlot, elem))
+        elif tag == 'TIER':
+            self._add_tier_xml(elem)
+        elif tag == 'LINGUISTIC_TYPE':
+            self._add_linguistic_type_xml(elem)
+        elif tag == 'CONSTRAINT':
+            self._add_constraint_xml(elem)
+        elif tag == 'CONTROLLED_VOCABULARY':
+            self._add_vocab_xml(elem)
+        elif tag == 'LICENSE':
+            self._add_license_xml(elem)
+        elif tag == "EXTERNAL_REF":
+            self._add_external_ref(elem)
+        elif tag == 'LANGUAGE':
+            self._add_language_xml(elem)
+        elif tag == 'LOCALE':
+            self._add_locale_xml(elem)
+        else:
+            logging.getLogger(__name__).warning(
+                "Unknown element type -- %s. Please consider to report an issue at %s", tag, __issue__)
+
     def _parse_root(self):
         """ [Internal] Parse XML structure to build ELAN structure
 
         General users should not use this function.
         """
         # Update ELAN file metadata from an XML node
-        self.__author = self.__xml_root.get('AUTHOR')
-        self.__date = self.__xml_root.get('DATE')
-        self.fileformat = self.__xml_root.get('FORMAT')
-        self.version = self.__xml_root.get('VERSION')
-        
+        self._update_root_xml(self.__xml_root)
         for elem in self.__xml_root:
-            if elem.tag == 'HEADER':
-                self._update_header_xml(elem)
-            elif elem.tag == 'TIME_ORDER':
-                self.__xml_time_order_node = elem
-                for time_elem in elem:
-                    self._add_timeslot_xml(time_elem)
-            elif elem.tag == 'TIER':
-                self._add_tier_xml(elem)
-            elif elem.tag == 'LINGUISTIC_TYPE':
-                self._add_linguistic_type_xml(elem)
-            elif elem.tag == 'CONSTRAINT':
-                self._add_constraint_xml(elem)
-            elif elem.tag == 'CONTROLLED_VOCABULARY':
-                self._add_vocab_xml(elem)
-            elif elem.tag == 'LICENSE':
-                self._add_license_xml(elem)
-            elif elem.tag == "EXTERNAL_REF":
-                self._add_external_ref(elem)
-            elif elem.tag == 'LANGUAGE':
-                self._add_language_xml(elem)
-            elif elem.tag == 'LOCALE':
-                self._add_locale_xml(elem)
-            else:
-                logging.getLogger(__name__).warning(
-                    f"Unknown element type -- {elem.tag}. Please consider to report an issue at {__issue__}")
+            self._parse_node(elem)
+
+    def _parse_stream(self, eaf_stream):
+        """ [Internal] Build ELAN structure from an XML stream without keeping the XML tree
+
+        Time slots and annotations are created as soon as their XML nodes have been read
+        and the nodes are released right after that.
+        Other top-level nodes (header, linguistic types, vocabularies, etc.) are small and are kept.
+
+        General users should not use this function.
+        """
+        parents = []  # open ancestors of the current node, xml.etree has no getparent()
+        tier = None
+        for event, elem in _iterparse(eaf_stream):
+            if event == 'start':
+                parents.append(elem)
+                depth = len(parents)
+                if depth == 1:
+                    self._update_root_xml(elem)
+                elif depth == 2 and elem.tag == 'TIER':
+                    # attributes are available at start, annotations are added one by one
+                    tier = self._add_tier_xml(elem.makeelement(elem.tag, dict(elem.attrib)))
+                continue
+            level = len(parents)
+            parents.pop()
+            parent = parents[-1] if parents else None
+            tag = elem.tag
+            if level == 3 and tag == 'TIME_SLOT':
+                self.time_order[elem.get('TIME_SLOT_ID')] = TimeSlot(ID=elem.get('TIME_SLOT_ID'),
+                                                                     value=elem.get('TIME_VALUE'))
+                _clear_xml_node(elem, parent)
+            elif level == 3 and tier is not None and tag == 'ANNOTATION':
+                _ann = _annotation_from_xml(elem, self.time_order)
+                tier.annotations.append(_ann)
+                self._register_ann(_ann)
+                _clear_xml_node(elem, parent)
+            elif level == 2:
+                if tag in ('TIME_ORDER', 'TIER'):
+                    tier = None
+                    _clear_xml_node(elem, parent)
+                else:
+                    self._parse_node(elem)
 
     def _resolve_structure(self):
         """ [Internal] Link different parts of the Doc structure together
         + Link linguistic types to controlled vocabularies
         + Create tier hierarchy
-        + Link annotations and tiers and vocabularies
+        + Link tiers and vocabularies
+        + Link ref annotations (annotations are registered when they are created)
 
         General users should not use this function.
         """
         # linguistic_types -> vocabs
-        for lingtype in self.linguistic_types:
+        for lingtype in self.__linguistic_types:
             if lingtype.controlled_vocabulary_ref:
                 lingtype.vocab = self.get_vocab(lingtype.controlled_vocabulary_ref)
         # resolves tiers' roots, parents, and type
         for tier in self:
-            for ann in tier:
-                self._register_ann(ann)
             lingtype = self.get_linguistic_type(tier._type_ref_id)
             lingtype.tiers.append(tier)  # type -> tiers
             if lingtype.vocab:
                 lingtype.vocab.tiers.append(tier)  # vocab -> tiers
             if tier.parent_ref is not None:
-                self[tier.parent_ref].children.append(tier)
+                self[tier.parent_ref]._add_child(tier)
         # resolve ref_ann
-        for ann in self.__ann_map.values():
-            if ann.ref_id:
-                ann.resolve(self)
+        self._resolve_refs()
 
 
     @classmethod
-    def parse_eaf_stream(cls, eaf_stream, *args, **kwargs):
+    def parse_eaf_stream(cls, eaf_stream, keep_xml=True, *args, **kwargs):
         """ Parse an EAF input stream and return an elan.Doc object
 
         >>> with open('test/data/test.eaf').read() as eaf_stream:
         >>>    eaf = elan.parse_eaf_stream(eaf_stream)
 
-        :param eaf_stream: EAF text input stream
+        When keep_xml is False the XML tree is not kept in memory, which is much lighter for large files,
+        but the returned document is read-only and cannot be saved.
+
+        :param eaf_stream: EAF input stream, binary streams are decoded by the XML parser
+        :param keep_xml: Keep the XML tree so that the document can be edited and saved, defaulted to True
+        :type keep_xml: bool
         :rtype: speach.elan.Doc
         """
-        _root = _parse_xml(eaf_stream)
         _doc = Doc()
-        # store XML root node
-        _doc.__xml_root = _root
-        # construct raw ELAN structure
-        _doc._parse_root()
+        if keep_xml:
+            # store XML root node
+            _doc.__xml_root = _parse_xml(eaf_stream)
+            # construct raw ELAN structure
+            _doc._parse_root()
+        else:
+            _doc._parse_stream(eaf_stream)
         # linking parts together
         _doc._resolve_structure()
         return _doc
 
     @classmethod
-    def parse_string(cls, eaf_string, *args, **kwargs):
+    def parse_string(cls, eaf_string, keep_xml=True, *args, **kwargs):
         """ Parse EAF content in a string and return an elan.Doc object
 
         >>> with open('test/data/test.eaf').read() as eaf_stream:
@@ -1805,12 +2189,14 @@ class Doc(DataObject):
 
         :param eaf_string: EAF content stored in a string
         :type eaf_string: str
+        :param keep_xml: Keep the XML tree so that the document can be edited and saved, defaulted to True
+        :type keep_xml: bool
         :rtype: speach.elan.Doc
         """
-        return cls.parse_eaf_stream(StringIO(eaf_string), *args, **kwargs)
+        return cls.parse_eaf_stream(StringIO(eaf_string), keep_xml, *args, **kwargs)
 
     @classmethod
-    def read_eaf(cls, eaf_path, encoding='utf-8', *args, **kwargs):
+    def read_eaf(cls, eaf_path, encoding='utf-8', keep_xml=True, *args, **kwargs):
         """ Read an EAF file and return an elan.Doc object
 
         >>> from speach import elan
@@ -1820,13 +2206,21 @@ class Doc(DataObject):
         :type eaf_path: str or Path-like object
         :param encoding: Encoding of the eaf stream, defaulted to UTF-8
         :type encoding: str
+        :param keep_xml: Keep the XML tree so that the document can be edited and saved.
+                         Use False to read large files faster with less memory.
+        :type keep_xml: bool
         :rtype: speach.elan.Doc
         """
         eaf_path = str(eaf_path)
         if eaf_path.startswith("~"):
             eaf_path = os.path.expanduser(eaf_path)
-        with chio.open(eaf_path, encoding=encoding, *args, **kwargs) as eaf_stream:
-            _doc = cls.parse_eaf_stream(eaf_stream)
+        if codecs.lookup(encoding).name == 'utf-8':
+            # the XML parser decodes UTF-8 itself, a text stream would be decoded and then re-encoded
+            _stream = chio.open(eaf_path, mode='rb', *args, **kwargs)
+        else:
+            _stream = chio.open(eaf_path, encoding=encoding, *args, **kwargs)
+        with _stream as eaf_stream:
+            _doc = cls.parse_eaf_stream(eaf_stream, keep_xml=keep_xml)
             _doc.path = eaf_path
             return _doc
 
@@ -1869,6 +2263,123 @@ parse_ecv_string = ExternalControlledVocabResource.parse_string
 parse_ecv_stream = ExternalControlledVocabResource.parse_stream
 
 
+@functools.lru_cache(maxsize=32)
+def _read_eaf_cached(eaf_path, mtime_ns, size, encoding, keep_xml):
+    """ [Internal] Cached reader, mtime_ns and size are part of the cache key only """
+    return Doc.read_eaf(eaf_path, encoding=encoding, keep_xml=keep_xml)
+
+
+def read_eaf_cached(eaf_path, encoding='utf-8', keep_xml=True):
+    """ Read an EAF file and reuse the parsed Doc object when the same file is read again
+
+    Cached documents are shared between callers, so they should be treated as read-only.
+    Use :func:`read_eaf` to get a document that can be modified.
+    A file is parsed again when its modification time or size changes.
+
+    >>> from speach import elan
+    >>> eaf = elan.read_eaf_cached("myfile.eaf")
+    >>> elan.read_eaf_cached("myfile.eaf") is eaf
+    True
+
+    :param eaf_path: Path to existing EAF file
+    :type eaf_path: str or Path-like object
+    :param encoding: Encoding of the eaf stream, defaulted to UTF-8
+    :type encoding: str
+    :param keep_xml: Keep the XML tree of cached documents. Use False to keep only the parsed model in the cache.
+    :type keep_xml: bool
+    :rtype: speach.elan.Doc
+    """
+    eaf_path = os.path.abspath(os.path.expanduser(str(eaf_path)))
+    _stat = os.stat(eaf_path)
+    return _read_eaf_cached(eaf_path, _stat.st_mtime_ns, _stat.st_size, encoding, keep_xml)
+
+
+def _clear_xml_node(elem, parent):
+    """ [Internal] Release a parsed XML node and detach it from its parent """
+    elem.clear()
+    if parent is not None:
+        parent.remove(elem)
+
+
+def iter_annotations(eaf_path, tier_filter=None):
+    """ Stream annotations from an EAF file without building the whole document tree
+
+    Each XML node is released and detached as soon as it has been read, so memory usage is bounded
+    by the number of time slots rather than by the number of annotations.
+    Yielded annotations are read-only and not attached to any :class:`Doc`.
+    Ref annotations are not resolved, i.e. their ``from_ts`` and ``to_ts`` are None.
+
+    >>> from speach import elan
+    >>> for tier, ann in elan.iter_annotations("myfile.eaf", lambda t: t.type_ref_id == 'Utterance'):
+    >>>     print(tier.ID, tier.participant, ann.from_ts, ann.to_ts, ann.text)
+
+    :param eaf_path: Path to existing EAF file or a binary input stream
+    :param tier_filter: A function that takes a tier information object (with ``ID``, ``participant``,
+                        ``type_ref_id``, and ``parent_ref``) and returns True if the tier should be read
+    :return: An iterator of (tier information, annotation) tuples
+    """
+    if not hasattr(eaf_path, 'read'):
+        eaf_path = os.path.expanduser(str(eaf_path))
+    time_order = {}
+    tier = None
+    parents = []  # open ancestors of the current node
+    for event, elem in _iterparse(eaf_path):
+        if event == 'start':
+            parents.append(elem)
+            if elem.tag == 'TIER':
+                tier = DataObject(ID=elem.get('TIER_ID'),
+                                  participant=elem.get('PARTICIPANT', ''),
+                                  type_ref_id=elem.get('LINGUISTIC_TYPE_REF'),
+                                  parent_ref=elem.get('PARENT_REF') if elem.get('PARENT_REF') else None)
+                if tier_filter is not None and not tier_filter(tier):
+                    tier = None
+            continue
+        parents.pop()
+        if elem.tag == 'TIME_SLOT':
+            time_order[elem.get('TIME_SLOT_ID')] = TimeSlot(ID=elem.get('TIME_SLOT_ID'), value=elem.get('TIME_VALUE'))
+        elif elem.tag == 'ANNOTATION':
+            if tier is not None:
+                yield tier, _annotation_from_xml(elem, time_order)
+        elif elem.tag == 'TIER':
+            tier = None
+        else:
+            # child nodes are released together with their parents
+            continue
+        _clear_xml_node(elem, parents[-1] if parents else None)
+
+
+def _annotation_from_xml(annotation_node, time_order):
+    """ [Internal] Create a detached annotation object from an ANNOTATION node """
+    alignable = _find_child(annotation_node, 'ALIGNABLE_ANNOTATION')
+    if alignable is not None:
+        attrs = alignable.attrib
+        from_ts_id = attrs.get('TIME_SLOT_REF1')
+        from_ts = time_order.get(from_ts_id)
+        if from_ts is None:
+            raise ValueError("Time slot ID not found ({})".format(from_ts_id))
+        to_ts_id = attrs.get('TIME_SLOT_REF2')
+        to_ts = time_order.get(to_ts_id)
+        if to_ts is None:
+            raise ValueError("Time slot ID not found ({})".format(to_ts_id))
+        value_node = _find_child(alignable, 'ANNOTATION_VALUE')
+        if value_node is None:
+            raise ValueError("ALIGNABLE_ANNOTATION node must contain an ANNOTATION_VALUE node")
+        cve_ref = attrs.get('CVE_REF')
+        return TimeAnnotation(attrs.get('ANNOTATION_ID'), from_ts, to_ts,
+                              _annotation_text(value_node, cve_ref), cve_ref=cve_ref)
+    ref_node = _find_child(annotation_node, 'REF_ANNOTATION')
+    if ref_node is not None:
+        value_node = _find_child(ref_node, 'ANNOTATION_VALUE')
+        if value_node is None:
+            raise ValueError("REF_ANNOTATION node must contain an ANNOTATION_VALUE node")
+        attrs = ref_node.attrib
+        cve_ref = attrs.get('CVE_REF')
+        return RefAnnotation(attrs.get('ANNOTATION_ID'), attrs.get('ANNOTATION_REF'),
+                             attrs.get('PREVIOUS_ANNOTATION'), _annotation_text(value_node, cve_ref),
+                             cve_ref=cve_ref)
+    raise ValueError("ANNOTATION node must not be empty")
+
+
 def open_eaf(*args, **kwargs):
     warnings.warn("elan.open_eaf() is deprecated and will be removed in near future. Use elan.read_eaf() instead.",
                   DeprecationWarning, stacklevel=2)
@@ -13,6 +13,7 @@ Media processor module for cutting, converting media contents (audio, video, etc
 
 import os
 import sys
+import shutil
 import logging
 import platform
 import subprocess
@@ -122,6 +123,11 @@ def _validate_args(infile, outfile):
     return _validate_infile(infile), _validate_outfile(outfile)
 
 
+def _same_format(infile, outfile):
+    """ [Internal] Check if two media files share the same container format (by file extension) """
+    return Path(infile).suffix.lower() == Path(outfile).suffix.lower()
+
+
 # ------------------------------------------------------------------------------
 # media APIs
 # ------------------------------------------------------------------------------
@@ -175,7 +181,7 @@ def concat(text, outfile, dir=None, *args, **kwargs):
                        outfile, **kwargs)
 
 
-def cut(infile, outfile, from_ts=None, to_ts=None, use_concat=False, *args, **kwargs):
+def cut(infile, outfile, from_ts=None, to_ts=None, use_concat=False, *args, threads=None, stream_copy=False, **kwargs):
     """ Cut a media file from a timestamp to another timestamp
 
     To cut myfile.wav from ``00:03:12`` to the end of the file and write output to outfile.ogg
@@ -190,6 +196,16 @@ def cut(infile, outfile, from_ts=None, to_ts=None, use_concat=False, *args, **kw
 
     >>> media.cut("myfile.wav", "outfile.ogg", from_ts="00:03:12", to_ts="00:04:27", use_concat=True)
 
+    When infile and outfile have the same extension, set stream_copy to True to copy media streams
+    without re-encoding, which is much faster.
+    Cut points then snap to the nearest packets (or keyframes for video) instead of being exact
+
+    >>> media.cut("myfile.ogg", "outfile.ogg", from_ts="00:03:12", to_ts="00:04:27", stream_copy=True)
+
+    When many cuts are run concurrently, set threads to 1 to prevent ffmpeg processes from oversubscribing CPU cores
+
+    >>> media.cut("myfile.wav", "outfile.ogg", from_ts="00:03:12", to_ts="00:04:27", threads=1)
+
     :param infile: Path to an existing file (in str or Path-like object)
     :param outfile: Path to output file (must not exist, or else a FileExistsError will be raised)
     :param from_ts: Leave as None to start cutting from the beginning
@@ -197,13 +213,27 @@ def cut(infile, outfile, from_ts=None, to_ts=None, use_concat=False, *args, **kw
     :param to_ts: Timestamp to end cutting. Leave as None to cut to the end of the file
     :type to_ts: a timestamp string or a TimeSlot object
     :param use_concat: Set to True to use demuxer to cut audio file. Both from_ts and to_ts must be specified when use. Defaulted to None
+    :param threads: Number of threads each ffmpeg process may use. Leave as None to let ffmpeg decide
+    :type threads: int
+    :param stream_copy: Set to True to copy media streams without re-encoding when infile and outfile have the same extension. Defaulted to False
+    :type stream_copy: bool
     """
     infile, outfile = _validate_args(infile, outfile)
+    if threads is not None:
+        args = ("-threads", threads, *args)
     if from_ts is None and to_ts is None:
         raise ValueError("from_ts and to_ts cannot be both None")
     if use_concat and (from_ts is None or to_ts is None):
         raise ValueError("when use_concat is True, both from_ts and to_ts must be defined")
-    if not use_concat:
+    if not use_concat and stream_copy and _same_format(infile, outfile):
+        # seek on input (fast seek) and copy streams without decoding
+        _seek = []
+        if from_ts is not None:
+            _seek += ["-ss", from_ts]
+        if to_ts is not None:
+            _seek += ["-to", to_ts]
+        _ffmpeg(*_seek, "-i", infile, "-c", "copy", *args, outfile)
+    elif not use_concat:
         # use -ss
         if from_ts is None or str(from_ts) in ["0", "00:00:00", "00:00:00.000"]:
             _ffmpeg("-i", infile, "-to", to_ts, *args, outfile)
@@ -215,7 +245,59 @@ def cut(infile, outfile, from_ts=None, to_ts=None, use_concat=False, *args, **kw
         concat_text = "\n".join([f"file '{infile}'",
                                  f"inpoint {from_ts}",
                                  f"outpoint {to_ts}"])
-        concat(concat_text, outfile)
+        concat(concat_text, outfile, None, *args)
+
+
+def cut_segments(infile, sections, outfiles, *args, threads=None, stream_copy=False, **kwargs):
+    """ Cut many sections out of a media file with a single ffmpeg process
+
+    The source is read and demuxed once by ffmpeg's segment muxer instead of once per section.
+    Sections must not overlap each other.
+
+    >>> media.cut_segments("myfile.ogg", [(1.04, 2.33), (3.2, 5.05)], ["out1.ogg", "out2.ogg"])
+
+    :param infile: Path to an existing file (in str or Path-like object)
+    :param sections: A list of (from_sec, to_sec) tuples, timestamps are in seconds
+    :param outfiles: A list of output file paths, one for each section (must not exist)
+    :param threads: Number of threads the ffmpeg process may use. Leave as None to let ffmpeg decide
+    :param stream_copy: Set to True to copy media streams without re-encoding when the input and output files have the same extension.
+                        Segment boundaries then snap to packets (or keyframes for video). Defaulted to False
+    :raises: FileExistsError, ValueError
+    """
+    infile = _validate_infile(infile)
+    outfiles = [_validate_outfile(f) for f in outfiles]
+    if len(sections) != len(outfiles):
+        raise ValueError("Each section must have exactly one output file")
+    elif not sections:
+        return
+    ext = Path(outfiles[0]).suffix
+    if any(Path(f).suffix != ext for f in outfiles):
+        raise ValueError("All output files must have the same extension")
+    # segment boundaries in playing order, the first segment always starts at 0
+    order = sorted(range(len(sections)), key=lambda i: sections[i][0])
+    points = [0]
+    seg_idx = [None] * len(sections)
+    for i in order:
+        from_sec, to_sec = sections[i]
+        if from_sec is None or to_sec is None or from_sec >= to_sec:
+            raise ValueError(f"Invalid section ({from_sec}, {to_sec})")
+        elif from_sec < points[-1]:
+            raise ValueError("Sections must not overlap")
+        elif from_sec > points[-1]:
+            points.append(from_sec)
+        seg_idx[i] = len(points) - 1
+        points.append(to_sec)
+    if threads is not None:
+        args = ("-threads", threads, *args)
+    if stream_copy and _same_format(infile, outfiles[0]):
+        args = ("-c", "copy", *args)
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(outfiles[0]) or None) as tmpdir:
+        _ffmpeg("-i", infile, "-f", "segment",
+                "-segment_times", ",".join(str(p) for p in points[1:]),
+                "-reset_timestamps", 1,
+                *args, os.path.join(tmpdir, f"%06d{ext}"), **kwargs)
+        for idx, outfile in zip(seg_idx, outfiles):
+            shutil.move(os.path.join(tmpdir, f"{idx:06d}{ext}"), outfile)
 
 
 def convert(infile, outfile, *args, ffmpeg_path=None):
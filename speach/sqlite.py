@@ -10,6 +10,7 @@ Support SQLite storage format
 
 
 import logging
+from collections import defaultdict as dd
 
 from chirptext import DataObject
 from chirptext import ttl
@@ -21,6 +22,16 @@ from .data import INIT_TTL_SQLITE
 # Configuration
 # ----------------------------------------------------------------------
 
+BULK_CHUNK_SIZE = 10000  # max number of rows per executemany() call
+SQLITE_MAX_VARS = 999  # SQLite's default SQLITE_MAX_VARIABLE_NUMBER
+# applied to every new connection
+SQLITE_PRAGMAS = ('PRAGMA journal_mode=WAL',
+                  'PRAGMA synchronous=NORMAL',
+                  'PRAGMA temp_store=MEMORY',
+                  'PRAGMA mmap_size=268435456',
+                  'PRAGMA cache_size=-200000')
+
+
 def getLogger():
     return logging.getLogger(__name__)
 
@@ -90,6 +101,28 @@ class TTLSQLite(Schema):
         self.add_table('tag', ['ID', 'sid', 'wid', 'cfrom', 'cto', 'value', 'source', 'type'], id_cols="ID")
         self.add_table('cwl', ['sid', 'cid', 'wid'], proto=CWLink)
 
+    def ctx(self):
+        """ Create a new execution context with performance PRAGMAs applied """
+        _ctx = super().ctx()
+        for pragma in SQLITE_PRAGMAS:
+            _ctx.cur.execute(pragma)
+        return _ctx
+
+    @with_ctx
+    def drop_indexes(self, tables=('sentence', 'token', 'concept', 'tag', 'cwl'), ctx=None):
+        """ Drop non-unique indexes of the given tables, which speeds up bulk inserts
+
+        :return: A list of SQL statements to recreate the dropped indexes
+        """
+        query = "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL AND tbl_name IN ({})".format(
+            ', '.join(['?'] * len(tables)))
+        index_sqls = []
+        for name, sql in ctx.select(query, tuple(tables)):
+            if not sql.upper().startswith('CREATE UNIQUE'):
+                ctx.execute('DROP INDEX "{}"'.format(name))
+                index_sqls.append(sql)
+        return index_sqls
+
     @with_ctx
     def new_corpus(self, name, title='', ctx=None):
         corpus = Corpus(name=name, title=title)
@@ -127,11 +160,35 @@ class TTLSQLite(Schema):
             a_tag.source = None
         return a_tag
 
+    def _insert_new_sent(self, sent_obj, ctx):
+        """ [Internal] Insert a sentence unless the same text exists in the same document
+
+        :return: ID of the inserted sentence or None if nothing was inserted
+        """
+        cols = self.sentence.columns
+        query = 'INSERT INTO sentence ({}) SELECT {} WHERE NOT EXISTS (SELECT 1 FROM sentence WHERE docID IS ? AND text = ?)'.format(
+            ', '.join(cols), ', '.join(['?'] * len(cols)))
+        params = tuple(getattr(sent_obj, col) for col in cols) + (sent_obj.docID, sent_obj.text)
+        cur = ctx.execute(query, params)
+        return cur.lastrowid if cur.rowcount > 0 else None
+
     @with_ctx
-    def save_sent(self, sent_obj, ctx=None):
+    def save_sent(self, sent_obj, on_conflict=None, ctx=None):
+        """ Save a sentence object and its tags, tokens, and concepts
+
+        :param on_conflict: Set to 'ignore' to skip the sentence if its text exists in the same document
+        :return: The saved sentence object or None if it was skipped
+        """
         # insert sentence
         # save sent obj first
-        sent_obj.ID = ctx.sent.save(sent_obj)
+        if on_conflict == 'ignore':
+            sent_obj.ID = self._insert_new_sent(sent_obj, ctx=ctx)
+            if sent_obj.ID is None:
+                return None
+        elif on_conflict is not None:
+            raise ValueError("Invalid on_conflict value ({})".format(on_conflict))
+        else:
+            sent_obj.ID = ctx.sent.save(sent_obj)
         # save sentence's tags
         for tag in sent_obj.tags:
             tag.sid = sent_obj.ID
@@ -159,6 +216,88 @@ class TTLSQLite(Schema):
                 ctx.cwl.save(cwl)
         return sent_obj
 
+    def _last_id(self, table_name, ctx):
+        """ [Internal] Get the last ID assigned to an AUTOINCREMENT table """
+        row = ctx.select_single('SELECT seq FROM sqlite_sequence WHERE name = ?', (table_name,))
+        return row[0] if row is not None and row[0] else 0
+
+    def _insert_rows(self, table, rows, chunk_size=BULK_CHUNK_SIZE, ctx=None):
+        """ [Internal] Insert row tuples into a table using multi-row VALUES statements
+
+        Each statement holds as many rows as SQLite's variable limit allows so that
+        statement preparation is not repeated for every row.
+        Full batches reuse the same statement through executemany().
+        """
+        if not rows:
+            return
+        cols = table.columns
+        row_sql = '({})'.format(', '.join(['?'] * len(cols)))
+        per_stmt = max(1, min(chunk_size, SQLITE_MAX_VARS // len(cols)))
+        query_tpl = 'INSERT INTO {} ({}) VALUES {{}}'.format(table.name, ', '.join(cols))
+        full_count = len(rows) - len(rows) % per_stmt
+        if full_count:
+            query = query_tpl.format(', '.join([row_sql] * per_stmt))
+            ctx.cur.executemany(query, (
+                [v for row in rows[idx:idx + per_stmt] for v in row]
+                for idx in range(0, full_count, per_stmt)))
+        if full_count < len(rows):
+            remain = rows[full_count:]
+            query = query_tpl.format(', '.join([row_sql] * len(remain)))
+            ctx.cur.execute(query, [v for row in remain for v in row])
+
+    @with_ctx
+    def save_sents_bulk(self, sents, chunk_size=BULK_CHUNK_SIZE, ctx=None):
+        """ Save a batch of sentences using multi-row INSERT statements
+
+        Sentence, token, concept, and tag IDs are allocated here instead of by SQLite
+        so that all rows can be grouped by table before inserting.
+        The sentence objects will be updated with their new IDs.
+        """
+        sent_id = self._last_id('sentence', ctx)
+        token_id = self._last_id('token', ctx)
+        concept_id = self._last_id('concept', ctx)
+        tag_id = self._last_id('tag', ctx)
+        rows = dd(list)
+
+        def _row(table, obj):
+            return tuple(getattr(obj, col) for col in table.columns)
+
+        for sent_obj in sents:
+            sent_id += 1
+            sent_obj.ID = sent_id
+            rows['sentence'].append(_row(self.sentence, sent_obj))
+            for tag in sent_obj.tags:
+                tag_id += 1
+                tag.ID = tag_id
+                tag.sid = sent_obj.ID
+                tag.wid = None  # ensure that wid is not saved
+                self.simplify_tag(tag)
+                rows['tag'].append(_row(self.tag, tag))
+            for idx, token in enumerate(sent_obj):
+                token_id += 1
+                token.ID = token_id
+                token.sid = sent_obj.ID
+                token.widx = idx
+                rows['token'].append(_row(self.token, token))
+                for tag in token:
+                    tag_id += 1
+                    tag.ID = tag_id
+                    tag.sid = sent_obj.ID
+                    tag.wid = token.ID
+                    self.simplify_tag(tag)
+                    rows['tag'].append(_row(self.tag, tag))
+            for concept in sent_obj.concepts:
+                concept_id += 1
+                concept.ID = concept_id
+                concept.sid = sent_obj.ID
+                rows['concept'].append(_row(self.concept, concept))
+                for token in concept.tokens:
+                    rows['cwl'].append((sent_obj.ID, concept.ID, token.ID))
+        # parents must be inserted before children
+        for table in (self.sentence, self.token, self.concept, self.tag, self.cwl):
+            self._insert_rows(table, rows[table.name], chunk_size=chunk_size, ctx=ctx)
+        return sents
+
     @with_ctx
     def get_sent(self, sentID, ctx=None):
         sent = ctx.sent.by_id(sentID)
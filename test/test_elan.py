@@ -12,6 +12,8 @@ Test ELAN support
 from datetime import datetime
 import os
 import unittest
+from io import BytesIO
+from tempfile import TemporaryDirectory
 from pathlib import Path
 
 from chirptext import chio
@@ -38,6 +40,11 @@ def read_eaf():
     return elan.read_eaf(TEST_EAF)
 
 
+def zero_slot_eaf():
+    """ Content of the test EAF file with the first time slot moved to 0 ms """
+    return TEST_EAF.read_text(encoding='utf-8').replace('TIME_VALUE="830"', 'TIME_VALUE="0"', 1)
+
+
 class TestELAN(unittest.TestCase):
 
     def test_safe_mode(self):
@@ -100,6 +107,20 @@ class TestELAN(unittest.TestCase):
         expected = [tuple(row) for row in chio.read_tsv(TEST_TSV)]
         self.assertEqual(expected, actual)
 
+    def test_eaf_to_csv_cli(self):
+        from speach.__main__ import convert_eaf_to_csv
+        # the marker annotation in the test file starts at ts1
+        expected = [tuple(row) if row[2] != '0.830' else (row[0], row[1], '0.000', row[3], row[3], row[5])
+                    for row in chio.read_tsv(TEST_TSV)]
+        with TemporaryDirectory() as tmpdir:
+            eaf_path = os.path.join(tmpdir, 'zero.eaf')
+            csv_path = os.path.join(tmpdir, 'zero.eaf.tsv')
+            with open(eaf_path, 'w', encoding='utf-8') as outfile:
+                outfile.write(zero_slot_eaf())
+            convert_eaf_to_csv(eaf_path, csv_path)
+            actual = [tuple(row) for row in chio.read_tsv(csv_path)]
+        self.assertEqual(expected, actual)
+
     def test_write_elan(self):
         eaf = read_eaf()
         xml_content = eaf.to_xml_str()
@@ -117,6 +138,143 @@ class TestELAN(unittest.TestCase):
         self.assertEqual(ann.from_ts.sec, 1.04)
         self.assertEqual(ann.to_ts.sec, 2.33)
 
+    def test_timeslot_value(self):
+        ts = elan.TimeSlot(ID='ts1', value=1040)
+        self.assertEqual((ts.sec, ts.ts), (1.04, '00:00:01.040'))
+        ts.value = 62345.4
+        self.assertEqual((ts.value, ts.sec, ts.ts), (62345, 62.345, '00:01:02.345'))
+        ts.value = None
+        self.assertEqual((ts.sec, ts.ts, str(ts)), (None, '', 'ts1'))
+
+    def test_timeslot_compare(self):
+        ts1, ts2, blank = elan.TimeSlot(value=100), elan.TimeSlot(value=200), elan.TimeSlot()
+        self.assertTrue(ts1 < ts2 <= 200 < 300 >= ts2 > ts1)
+        self.assertTrue(ts1 == 100 and ts1 != ts2 and ts1 == elan.TimeSlot(value=100))
+        self.assertTrue(blank < ts1 and ts1 > blank and blank <= 0)
+        self.assertTrue(ts1 > None and not ts1 < None and ts1 != None)
+        self.assertEqual(len({ts1, elan.TimeSlot(value=100)}), 2)
+
+    def test_overlap(self):
+        eaf = read_eaf()
+        utts = eaf['Person1 (Utterance)']
+        markers = eaf['marker']
+        self.assertEqual(markers[0].overlap(utts[0]), 1290)  # utterance 1 is within the marker
+        self.assertEqual(markers[0].overlap(utts[1]), 1850)
+        self.assertEqual(utts[0].overlap(utts[1]), -870)  # distance between the two
+
+    def test_tier_filter(self):
+        eaf = read_eaf()
+        tier = eaf['Person1 (Utterance)']
+        expected = [a.ID for a in tier if 1040 <= a.from_ts.value and a.to_ts.value <= 5100]
+        self.assertEqual(len(expected), 2)
+        self.assertEqual([a.ID for a in tier.filter(1040, 5100)], expected)
+        # annotations must end before to_ts
+        expected = [a.ID for a in tier if 1040 <= a.from_ts.value and a.to_ts.value <= 5000]
+        self.assertEqual(len(expected), 1)
+        self.assertEqual([a.ID for a in tier.filter(1040, 5000)], expected)
+        self.assertEqual([a.ID for a in tier.filter(elan.TimeSlot(value=1040), elan.TimeSlot(value=5000))], expected)
+        self.assertEqual(list(tier.filter()), list(tier))
+        self.assertEqual(list(tier.filter(to_ts=0)), [])
+        # changing a time slot value is reflected
+        tier[0].from_ts.value = 999999
+        self.assertNotIn(tier[0], list(tier.filter(to_ts=5000)))
+        self.assertIn(tier[0], list(tier.filter(from_ts=999999)))
+        # ref annotations are filtered by their referent annotations
+        langs = list(eaf['Person1 (Language)'].filter(1040, 5100))
+        self.assertTrue(langs)
+        self.assertTrue(all(1040 <= a.from_ts.value and a.to_ts.value <= 5100 for a in langs))
+
+    def test_tier_filter_after_edit(self):
+        eaf = read_eaf()
+        tier = eaf['Person1 (Utterance)']
+        ids = [a.ID for a in tier.filter()]
+        # in-place changes of the annotation list are picked up
+        tier.annotations.reverse()
+        self.assertEqual([a.ID for a in tier.filter()], ids[::-1])
+        first = tier.annotations[0]
+        tier.annotations[0] = tier.annotations[-1]
+        self.assertNotIn(first, list(tier.filter()))
+        # changing a time slot only resets the tiers that use it
+        others = [t for t in eaf.tiers() if t is not tier and not any(a.from_ts is tier[-1].from_ts for a in t)]
+        self.assertTrue(others)
+        cached = [t._time_index() for t in others]
+        tier[-1].from_ts.value = 999999
+        self.assertEqual([a.ID for a in tier.filter(from_ts=999999)], [tier[0].ID, tier[-1].ID])
+        for t, index in zip(others, cached):
+            self.assertIs(t._time_index()[0], index[0])
+
+    def test_iter_annotations(self):
+        eaf = read_eaf()
+        expected = [(tier.ID, ann.ID, ann.text, ann.from_ts.value if tier.time_alignable else None)
+                    for tier in eaf.tiers() for ann in tier]
+        actual = [(tier.ID, ann.ID, ann.text, ann.from_ts.value if ann.from_ts else None)
+                  for tier, ann in elan.iter_annotations(TEST_EAF)]
+        self.assertEqual(expected, actual)
+        # filter by tier type
+        utterances = [(tier.ID, ann.text) for tier, ann
+                      in elan.iter_annotations(TEST_EAF, lambda t: t.type_ref_id == 'Utterance')]
+        expected = [(tier.ID, ann.text) for tier in eaf.tiers() if tier.type_ref_id == 'Utterance' for ann in tier]
+        self.assertTrue(utterances)
+        self.assertEqual(expected, utterances)
+
+    def test_iter_annotations_zero_slot(self):
+        with TemporaryDirectory() as tmpdir:
+            eaf_path = os.path.join(tmpdir, 'zero.eaf')
+            with open(eaf_path, 'w', encoding='utf-8') as outfile:
+                outfile.write(zero_slot_eaf())
+            starts = {ann.ID: ann.from_ts.value for _, ann in elan.iter_annotations(eaf_path) if ann.from_ts}
+            expected = {ann.ID: ann.from_ts.value for tier in elan.read_eaf(eaf_path) for ann in tier
+                        if tier.time_alignable}
+        self.assertIn(0, starts.values())
+        self.assertEqual(expected, starts)
+
+    def test_read_eaf_without_xml(self):
+        for eaf_path in (TEST_EAF, TEST_EAF2):
+            eaf = elan.read_eaf(eaf_path)
+            light = elan.read_eaf(eaf_path, keep_xml=False)
+            self.assertEqual(eaf.to_csv_rows(), light.to_csv_rows())
+            self.assertEqual([t.ID for t in eaf.tiers()], [t.ID for t in light.tiers()])
+            self.assertEqual([[c.ID for c in t.children] for t in eaf.tiers()],
+                             [[c.ID for c in t.children] for t in light.tiers()])
+            self.assertEqual(eaf.media_file, light.media_file)
+            self.assertEqual(len(eaf.vocabs), len(light.vocabs))
+            self.assertRaises(ValueError, lambda: light.to_xml_str())
+
+    def test_read_eaf_without_xml_zero_slot(self):
+        content = zero_slot_eaf().encode('utf-8')
+        eaf = elan.parse_eaf_stream(BytesIO(content))
+        light = elan.parse_eaf_stream(BytesIO(content), keep_xml=False)
+        self.assertEqual(eaf.time_order['ts1'].value, 0)
+        self.assertEqual(light.time_order['ts1'].value, 0)
+        self.assertEqual(eaf.to_csv_rows(), light.to_csv_rows())
+
+    def test_read_eaf_without_xml_releases_nodes(self):
+        roots = []
+        _iterparse = elan._iterparse
+
+        def iterparse(*args, **kwargs):
+            for event, elem in _iterparse(*args, **kwargs):
+                if not roots:
+                    roots.append(elem)
+                yield event, elem
+        elan._iterparse = iterparse
+        try:
+            light = elan.read_eaf(TEST_EAF, keep_xml=False)
+        finally:
+            elan._iterparse = _iterparse
+        self.assertTrue(light.time_order)
+        # processed time slots and tiers must not stay attached to the document root
+        self.assertEqual([], [child.tag for child in roots[0] if child.tag in ('TIME_ORDER', 'TIER')])
+
+    def test_read_eaf_cached(self):
+        eaf = elan.read_eaf_cached(TEST_EAF)
+        self.assertIs(eaf, elan.read_eaf_cached(str(TEST_EAF)))
+        self.assertIsNot(eaf, elan.read_eaf(TEST_EAF))
+        self.assertEqual(eaf.to_csv_rows(), read_eaf().to_csv_rows())
+        light = elan.read_eaf_cached(TEST_EAF, keep_xml=False)
+        self.assertIsNot(eaf, light)
+        self.assertEqual(eaf.to_csv_rows(), light.to_csv_rows())
+
     def test_elan_locale(self):
         loc = elan.Locale(language_code='vi')
         self.assertEqual(repr(loc), "Locale(language_code='vi')")
@@ -323,6 +481,22 @@ class TestEditElan(unittest.TestCase):
         self.assertEqual(marker_annotations, expected_annotations)
         self.assertEqual(eaf.to_csv_rows(), eaf2.to_csv_rows())
 
+    def test_get_child(self):
+        eaf = read_eaf()
+        utterance = eaf['Person1 (Utterance)']
+        self.assertIs(utterance.get_child('Person1 (Chunk)'), eaf['Person1 (Chunk)'])
+        self.assertIsNone(utterance.get_child('Person1 (ChunkLanguage)'))
+        # renamed child tiers can be found by their new IDs
+        eaf['Person1 (Chunk)'].ID = 'Person1-Chunk'
+        self.assertIsNone(utterance.get_child('Person1 (Chunk)'))
+        self.assertIs(utterance.get_child('Person1-Chunk'), eaf['Person1-Chunk'])
+
+    def test_roots(self):
+        eaf = read_eaf()
+        self.assertEqual([t.ID for t in eaf.roots], ['Person1 (Utterance)', 'marker'])
+        eaf.new_tier('Person2 (Utterance)', 'Utterance', participant='P002')
+        self.assertEqual([t.ID for t in eaf.roots], ['Person1 (Utterance)', 'marker', 'Person2 (Utterance)'])
+
     def test_updating_media_url(self):
         eaf = read_eaf()
         self.assertEqual(eaf.media_file, '')
@@ -367,6 +541,17 @@ class TestEditElan(unittest.TestCase):
                      ('R004x', 'R004 (Utterance)')]
         self.assertEqual(expected2, participants2)
 
+    def test_save_options(self):
+        eaf = read_eaf()
+        with TemporaryDirectory() as tmpdir:
+            eaf_path = os.path.join(tmpdir, 'test.eaf')
+            self.assertRaises(TypeError, lambda: eaf.save(eaf_path, default_namespace='http://example.org/eaf'))
+            self.assertFalse(os.path.exists(eaf_path))
+            eaf.save(eaf_path, xml_declaration=True)
+            with open(eaf_path, 'rb') as infile:
+                self.assertTrue(infile.read().startswith(b'<?xml'))
+            self.assertEqual(elan.read_eaf(eaf_path).to_csv_rows(), eaf.to_csv_rows())
+
     def test_create_new_elan_file(self):
         eaf = elan.create()
         # test add new vocab
@@ -454,6 +639,26 @@ class TestEditElan(unittest.TestCase):
                       ('a9', 'tabetai', 1.123, 2.456, 'a1')])]
         self.assertEqual(expected, actual)
 
+    def test_add_symbolic_subdivision(self):
+        eaf = elan.create('test.wav')
+        eaf.new_linguistic_type('Utterance')
+        eaf.new_linguistic_type('Tokens', 'Symbolic_Subdivision')
+        tu = eaf.new_tier('Baby (Utterance)', 'Utterance')
+        tt = eaf.new_tier('Baby (Tokens)', 'Tokens', 'Baby (Utterance)')
+        a = tu.new_annotation('ano ringo tabetai', 1123, 2456)
+        b = tu.new_annotation('mikan', 3000, 3500)
+        tt.new_annotation('ano', values=['ringo'], ann_ref_id=a.ID)
+        tt.new_annotation('mikan', ann_ref_id=b.ID)
+        # new tokens continue the existing chain of the same referent annotation
+        tt.new_annotation('tabetai', ann_ref_id=a.ID)
+        eaf = elan.parse_string(eaf.to_xml_str())
+        actual = [(t.ID, t.value, t.ref_id, t.previous) for t in eaf['Baby (Tokens)']]
+        expected = [('a3', 'ano', 'a1', None),
+                    ('a4', 'ringo', 'a1', 'a3'),
+                    ('a5', 'mikan', 'a2', None),
+                    ('a6', 'tabetai', 'a1', 'a4')]
+        self.assertEqual(expected, actual)
+
     def test_cv_check_add_annotation_ref(self):
         en_id = 'cveid_20c62fa0-8144-44cb-b0d1-ebe9bec51cc5'
         eaf = read_eaf()
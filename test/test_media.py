@@ -10,7 +10,9 @@ Test Victoria media module
 # :license: MIT, see LICENSE for more details.
 
 import os
+import tempfile
 import unittest
+from unittest import mock
 from pathlib import Path
 
 from speach import media
@@ -57,6 +59,17 @@ class TestMedia(unittest.TestCase):
         media.convert(TEST_OGG, TEST_WAV, "-loglevel", "error")
         self.assertTrue(TEST_WAV.is_file())
 
+    def test_cut_segments(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            outfiles = [os.path.join(tmpdir, f"seg{i}.ogg") for i in range(3)]
+            # sections do not need to be sorted or adjacent
+            media.cut_segments(TEST_OGG, [(5, 7.5), (1, 2), (2, 4)], outfiles, "-loglevel", "error")
+            for f in outfiles:
+                self.assertTrue(os.path.isfile(f))
+            self.assertEqual(sorted(os.listdir(tmpdir)), ["seg0.ogg", "seg1.ogg", "seg2.ogg"])
+        with self.assertRaises(ValueError):
+            media.cut_segments(TEST_OGG, [(1, 3), (2, 4)], ["a.ogg", "b.ogg"])
+
     def test_crc32(self):
         h = media.crc32_str("hello CRC32")
         self.assertEqual(h, 'C1281542')
@@ -64,6 +77,50 @@ class TestMedia(unittest.TestCase):
         self.assertEqual(h2, "7903DEC5")
 
 
+class TestMediaCommands(unittest.TestCase):
+    """ Check ffmpeg arguments built by the media functions without running ffmpeg """
+
+    def test_same_format(self):
+        self.assertTrue(media._same_format("a/myfile.ogg", "out.OGG"))
+        self.assertFalse(media._same_format("myfile.ogg", "out.wav"))
+        self.assertFalse(media._same_format("myfile", "out.wav"))
+
+    def test_cut_recode(self):
+        with tempfile.TemporaryDirectory() as tmpdir, mock.patch.object(media, '_ffmpeg') as ffmpeg:
+            # media streams are re-encoded by default, even for the same format
+            media.cut(TEST_OGG, os.path.join(tmpdir, "out.ogg"), from_ts="00:00:01", to_ts="00:00:02")
+            self.assertNotIn("copy", ffmpeg.call_args[0])
+            self.assertEqual(ffmpeg.call_args[0][:1], ("-i",))
+
+    def test_cut_stream_copy(self):
+        with tempfile.TemporaryDirectory() as tmpdir, mock.patch.object(media, '_ffmpeg') as ffmpeg:
+            outfile = os.path.join(tmpdir, "out.ogg")
+            media.cut(TEST_OGG, outfile, from_ts="00:00:01", to_ts="00:00:02", stream_copy=True)
+            self.assertEqual(ffmpeg.call_args[0], ("-ss", "00:00:01", "-to", "00:00:02", "-i", str(TEST_OGG),
+                                                   "-c", "copy", outfile))
+            # streams cannot be copied into another format
+            media.cut(TEST_OGG, os.path.join(tmpdir, "out.wav"), from_ts="00:00:01", to_ts="00:00:02", stream_copy=True)
+            self.assertNotIn("copy", ffmpeg.call_args[0])
+
+    def test_cut_segments_args(self):
+        def fake_ffmpeg(*args, **kwargs):
+            # create the segment files that ffmpeg would write
+            pattern = args[-1]
+            for idx in range(len(args[args.index("-segment_times") + 1].split(",")) + 1):
+                Path(pattern % idx).touch()
+
+        for stream_copy in (False, True):
+            with tempfile.TemporaryDirectory() as tmpdir, \
+                    mock.patch.object(media, '_ffmpeg', side_effect=fake_ffmpeg) as ffmpeg:
+                outfiles = [os.path.join(tmpdir, f"seg{i}.ogg") for i in range(2)]
+                media.cut_segments(TEST_OGG, [(3, 4), (1, 2)], outfiles, stream_copy=stream_copy)
+                args = ffmpeg.call_args[0]
+                self.assertEqual(args[args.index("-segment_times") + 1], "1,2,3,4")
+                self.assertEqual("copy" in args, stream_copy)
+                for f in outfiles:
+                    self.assertTrue(os.path.isfile(f))
+
+
 # -------------------------------------------------------------------------------
 # MAIN
 # -------------------------------------------------------------------------------
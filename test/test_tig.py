@@ -11,6 +11,8 @@ Test TTL Interlinear Gloss (TIG)
 
 import os
 import io
+import argparse
+import tempfile
 import unittest
 import logging
 from collections import OrderedDict
@@ -21,6 +23,7 @@ from chirptext import deko
 from speach import ttl
 from speach import ttlig
 from speach.ttlig import IGStreamReader, TTLTokensParser
+from speach import __main__ as speach_cli
 
 
 # -------------------------------------------------------------------------------
@@ -270,6 +273,29 @@ I have two cat-s.
         print("Testing TTLIG with multiple spaces")
 
 
+class TestHTMLExport(unittest.TestCase):
+
+    @unittest.skipIf(not speach_cli._LXML_AVAILABLE, "lxml is required for HTML export")
+    def test_make_html(self):
+        doc = ttl.Document('test')
+        sent = doc.sents.new('猫が好き & 犬')
+        sent.tokens = ['猫', 'が', '好き', '&', '犬']
+        sent[0].tags.new('{猫/ねこ}', type='furi')
+        sent.tag.translation = 'I like cats & dogs'
+        doc.sents.new('It rains <a lot>.')
+        with tempfile.TemporaryDirectory() as tmpdir:
+            ttl_path = os.path.join(tmpdir, 'test.json')
+            html_path = os.path.join(tmpdir, 'test.html')
+            ttl.write_json(ttl_path, doc)
+            args = argparse.Namespace(ttl=ttl_path, output=html_path, compact=True, delimiter=' ')
+            speach_cli.make_html(None, args)
+            actual = chio.read_file(html_path)
+        expected = ('<doc><sent><text><ruby><rb>猫</rb><rt>ねこ</rt></ruby> が 好き &amp; 犬</text><br/>'
+                    '<trans>I like cats &amp; dogs</trans><br/><br/></sent>'
+                    '<sent><text>It rains &lt;a lot&gt;.</text><br/><br/></sent></doc>')
+        self.assertEqual(expected, actual)
+
+
 # -------------------------------------------------------------------------------
 # MAIN
 # -------------------------------------------------------------------------------
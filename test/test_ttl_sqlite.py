@@ -10,8 +10,11 @@ Test basic TTL SQLite
 # :license: MIT, see LICENSE for more details.
 
 import os
+import argparse
+import tempfile
 from pathlib import Path
 import unittest
+from unittest import mock
 import logging
 
 from speach import ttl
@@ -136,6 +139,97 @@ class TestTTLSQLite(unittest.TestCase):
             lex = [(t, c) for t, c in db.lexicon(limit=2, ctx=ctx)]
             self.assertEqual(lex, [('。', 3), ('が', 2)])
 
+    def test_save_sent_ignore(self):
+        db = get_db(True)
+        with db.ctx() as ctx:
+            corpus = db.new_corpus('eng', ctx=ctx)
+            doc = db.new_doc(name='eng1', corpusID=corpus.ID, ctx=ctx)
+            doc2 = db.new_doc(name='eng2', corpusID=corpus.ID, ctx=ctx)
+            for docID in (doc.ID, doc.ID, doc2.ID):
+                sent = ttl.Sentence('It rains.', docID=docID)
+                sent.tokens = ['It', 'rains', '.']
+                db.save_sent(sent, on_conflict='ignore', ctx=ctx)
+            self.assertEqual(len(ctx.sent.select('docID = ?', (doc.ID,))), 1)
+            self.assertEqual(len(ctx.sent.select('docID = ?', (doc2.ID,))), 1)
+            self.assertEqual(len(ctx.token.select()), 6)
+            # skipped sentences are not saved
+            sent = ttl.Sentence('It rains.', docID=doc.ID)
+            self.assertIsNone(db.save_sent(sent, on_conflict='ignore', ctx=ctx))
+            self.assertIsNone(sent.ID)
+            # duplicated sentences are allowed by default
+            db.save_sent(sent, ctx=ctx)
+            self.assertEqual(len(ctx.sent.select('docID = ?', (doc.ID,))), 2)
+            with self.assertRaises(ValueError):
+                db.save_sent(sent, on_conflict='replace', ctx=ctx)
+
+    def test_drop_indexes(self):
+        db = get_db(True)
+        query = "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'token' AND sql IS NOT NULL"
+        with db.ctx() as ctx:
+            token_indexes = [r[0] for r in ctx.select(query)]
+            self.assertIn('token_|_text', token_indexes)
+            index_sqls = db.drop_indexes(ctx=ctx)
+            self.assertFalse(ctx.select(query))
+            # unique indexes are kept
+            self.assertTrue(ctx.select("SELECT name FROM sqlite_master WHERE name = 'cwl_|_unique'"))
+            for sql in index_sqls:
+                ctx.execute(sql)
+            self.assertEqual(token_indexes, [r[0] for r in ctx.select(query)])
+
+    def test_save_sents_bulk(self):
+        testdoc_path = os.path.join(TEST_DIR, 'data', 'test.json')
+        db = get_db(True)
+        bulk_db = get_db(True)
+        with db.ctx() as ctx, bulk_db.ctx() as bulk_ctx:
+            for a_db, a_ctx in ((db, ctx), (bulk_db, bulk_ctx)):
+                corpus = a_db.new_corpus('jpn', ctx=a_ctx)
+                doc = a_db.new_doc(name='jpn1', corpusID=corpus.ID, ctx=a_ctx)
+                sents = list(ttl.read_json(testdoc_path))
+                sents[0].tag.eng = 'I like calico cats.'
+                sents[0][0].tag.romaji = 'mi'
+                sents[1].concepts.new('rain', clemma='ame', tokens=[0])
+                for sent in sents:
+                    sent.ID = None
+                    sent.docID = doc.ID
+                if a_db is db:
+                    for sent in sents:
+                        db.save_sent(sent, ctx=ctx)
+                else:
+                    bulk_db.save_sents_bulk(sents[:1], ctx=bulk_ctx)
+                    bulk_db.save_sents_bulk(sents[1:], chunk_size=2, ctx=bulk_ctx)
+            for table in ('sentence', 'token', 'concept', 'tag', 'cwl'):
+                query = 'SELECT * FROM {}'.format(table)
+                expected = [tuple(r) for r in ctx.select(query)]
+                actual = [tuple(r) for r in bulk_ctx.select(query)]
+                self.assertTrue(expected)
+                self.assertEqual(expected, actual)
+
+    def test_bulk_convert_failure_keeps_indexes(self):
+        from speach.__main__ import make_db
+        query = "SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL ORDER BY name"
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = os.path.join(tmpdir, 'test.db')
+            args = argparse.Namespace(ttl=os.path.join(TEST_DIR, 'data', 'test.json'), db=db_path,
+                                      corpus='jpn', doc=None, bulk=True, topk=None)
+            with TTLSQLite(db_path).ctx() as ctx:
+                expected = [r[0] for r in ctx.select(query)]
+            self.assertTrue(expected)
+            with mock.patch.object(TTLSQLite, 'save_sents_bulk', side_effect=RuntimeError("insert failed")):
+                with self.assertRaises(RuntimeError):
+                    make_db(None, args)
+            with TTLSQLite(db_path).ctx() as ctx:
+                self.assertEqual(expected, [r[0] for r in ctx.select(query)])
+                # the partially converted document is not kept
+                self.assertFalse(ctx.select("SELECT * FROM sentence"))
+
+    def test_convert_bulk_option(self):
+        from speach import __main__ as speach_cli
+        argv = ['speach', 'convert', 'test.json', 'test.db', 'jpn', 'doc']
+        for extra, bulk in (([], True), (['--no-bulk'], False)):
+            with mock.patch.object(speach_cli, 'make_db') as make_db, mock.patch('sys.argv', argv + extra):
+                speach_cli.main()
+            self.assertEqual(make_db.call_args[0][1].bulk, bulk)
+
 
 class TestTTLSQLiteMeta(unittest.TestCase):
 